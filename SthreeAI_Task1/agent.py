@@ -1,46 +1,42 @@
+import asyncio
+import logging
+import os
+import time
+
+# Taken before the heavy imports so prewarm can report how long they took
+_import_started = time.perf_counter()
+
 from dotenv import load_dotenv
 
 from livekit import agents, rtc
-from livekit.agents import AgentServer, AgentSession, Agent, room_io, RoomInputOptions
+from livekit.agents import NOT_GIVEN, AgentServer, AgentSession, Agent, NotGivenOr, RunContext, StopResponse, function_tool, room_io, RoomInputOptions
 from livekit.plugins import (
     google,
     noise_cancellation,
 )
+from livekit.plugins.google.realtime.realtime_api import RealtimeSession as GeminiRealtimeSession
+from google.genai import types as genai_types
+
+from faq_cache import AnswerCache, FaqMatcher
+from greeting import GreetingCache, prompt_version
+from knowledge import KnowledgeBase
+from speech import SpeechRecorder
+
+IMPORT_SECONDS = time.perf_counter() - _import_started
 
 load_dotenv()
 
-class SthreeAI(Agent):
-    def __init__(self) -> None:
-        instructions = """You are Sthree AI, the official voice assistant for Iron Lady (https://iamironlady.com), 
-a transformative leadership organization dedicated to empowering women in business and careers.
-
-YOUR NAME: Sthree AI (Sthree means "woman" in Sanskrit)
-
-ABOUT IRON LADY:
-- Founded by Rajesh Bhat and Suvarna Hegde
-- Delivers high-impact leadership programs specifically for women
-- Uses Business War Tactics, Art of War, and Strength-Based Excellence methodologies
-- Developed over 25+ years of research and implementation
-- Mission: "Million Women at the TOP"
-
-KEY PROGRAMS:
-1. Leadership Essentials Program (LEP)
-2. 1-Crore Club - helping women achieve crore+ incomes
-3. 100 Board Members - supporting women to reach board positions
-4. Master Business Warfare (MBW)
-5. Masterclass programs (online and offline)
-
-FOUNDERS:
-- Rajesh Bhat: Serial social entrepreneur, first man to wear saree on TEDx, CNN "Real Hero of India"
-- Suvarna Hegde: CEO and creator of Business War Tactics for Women, ex-Infosys/Bosch/Philips innovation specialist
-
-WHAT IRON LADY ADDRESSES:
-- Gender bias in workplace
-- Pay inequality (women earn only 18% of labor income in India vs men's 82%)
-- Career advancement barriers
-- Glass ceilings
-- Workplace politics
-- Work-life balance challenges
+logger = logging.getLogger("sthree-ai")
+
+VOICE = "Despina"
+
+GREETING_INSTRUCTIONS = "Greet the user warmly. Introduce yourself as Sthree AI, the voice assistant for Iron Lady. Briefly mention that you're here to help with information about leadership programs for women, and ask how you can assist them today."
+GREETING_VERSION = prompt_version(GREETING_INSTRUCTIONS)
+
+# Kept short and fixed: facts come from the knowledge base through
+# search_knowledge_base, so adding content does not grow every session
+INSTRUCTIONS = """You are Sthree AI, the official voice assistant for Iron Lady (https://iamironlady.com), \
+a leadership organization that empowers women in business and careers. Sthree means "woman" in Sanskrit.
 
 YOUR ROLE:
 - Answer questions about Iron Lady programs, founders, and mission
@@ -50,35 +46,370 @@ YOUR ROLE:
 - Be warm, empowering, and supportive
 - Guide women toward their leadership potential
 
-BOOK: "The Shameless Lady" - manifesto for women to WIN, featuring real stories of Iron Ladies
+FACTS:
+- Before stating any fact about Iron Lady, look it up with the search_knowledge_base tool
+- If the tool finds nothing, say you don't have that detail and point the visitor to https://iamironlady.com
+- Never invent programs, dates, prices, people or testimonials
 
 When greeting, introduce yourself as Sthree AI and be warm and empowering. Ask how you can help them on their leadership journey."""
-        
-        super().__init__(instructions=instructions)
 
-server = AgentServer()
+KNOWLEDGE_FILE = os.getenv("KNOWLEDGE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge_base.json"))
+KNOWLEDGE_TOOL = "search_knowledge_base"
 
-@server.rtc_session()
-async def my_agent(ctx: agents.JobContext):
-    session = AgentSession(
-        llm=google.beta.realtime.RealtimeModel(
-            voice="Despina"
+greeting_cache = GreetingCache(
+    os.getenv("GREETING_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "greeting_cache"))
+)
+
+# Tokens from server.py dispatch this agent by name into each visitor's room
+AGENT_NAME = os.getenv("LIVEKIT_AGENT_NAME", "sthree-ai")
+
+# Conversations one worker process group takes before reporting itself full
+MAX_SESSIONS_PER_WORKER = int(os.getenv("AGENT_MAX_SESSIONS", "8"))
+LOAD_THRESHOLD = float(os.getenv("AGENT_LOAD_THRESHOLD", "0.95"))
+
+cpu_monitor = agents.utils.hw.get_cpu_monitor()
+
+# FAQ answer cache (faq_cache.py). Turns are then detected locally with VAD
+# and transcribed with Google Cloud Speech, so a cached answer can be played
+# before the realtime model is asked to reply.
+FAQ_CACHE_ENABLED = os.getenv("FAQ_CACHE_ENABLED", "0") == "1"
+FAQ_FILE = os.getenv("FAQ_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "faq.json"))
+FAQ_CACHE_FILE = os.getenv("FAQ_CACHE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "answer_cache.db"))
+FAQ_MATCH_THRESHOLD = float(os.getenv("FAQ_MATCH_THRESHOLD", "0.85"))
+FAQ_CACHE_MAX_ENTRIES = int(os.getenv("FAQ_CACHE_MAX_ENTRIES", "200"))
+FAQ_CACHE_MAX_AGE_HOURS = float(os.getenv("FAQ_CACHE_MAX_AGE_HOURS", "168"))
+
+
+def worker_load(server: AgentServer) -> float:
+    """Load reported to LiveKit: the busier of session slots and CPU.
+
+    LiveKit stops offering jobs to a worker at LOAD_THRESHOLD and favours
+    the least-loaded of the rest, so new conversations spread across every
+    running agent.py.
+    """
+    sessions = len(server.active_jobs) / MAX_SESSIONS_PER_WORKER
+    return min(1.0, max(sessions, cpu_monitor.cpu_percent(interval=0.25)))
+
+
+def _read_file(path):
+    """Read a file once so later opens are served from the OS page cache"""
+    with open(path, "rb") as f:
+        while f.read(1 << 20):
+            pass
+
+
+def format_timings(timings):
+    return ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in timings.items())
+
+
+class HeldTurnRealtimeSession(GeminiRealtimeSession):
+    """Holds each user turn's audio back from Gemini until the agent asks it to reply.
+
+    A turn answered from the FAQ cache must never reach the model: its audio
+    would be answered along with the next question. The audio is kept here
+    and sent by generate_reply(); clear_audio() drops it. Interruptions still
+    reach Gemini at once, so a reply the caller talks over stops generating.
+
+    This overrides the Google plugin's session, whose audio path has no
+    public hook. requirements.txt pins the plugin to the version it was
+    written against; run faqtest.py after upgrading it.
+    """
+
+    def __init__(self, realtime_model) -> None:
+        super().__init__(realtime_model)
+        self._held_turn = None
+
+    def start_user_activity(self) -> None:
+        # The activity itself opens when the turn is sent (or on interrupt)
+        if self._held_turn is None:
+            self._held_turn = []
+
+    def interrupt(self) -> None:
+        self.start_user_activity()
+        # Gemini treats an activity start as an interruption. If the turn is
+        # then answered from the cache, the activity stays open but empty
+        # and the next turn sent to the model reuses it.
+        super().start_user_activity()
+
+    def push_audio(self, frame: rtc.AudioFrame) -> None:
+        if self._held_turn is None:
+            super().push_audio(frame)
+        else:
+            self._held_turn.append(frame)
+
+    def clear_audio(self) -> None:
+        self._held_turn = None
+
+    def generate_reply(self, *, instructions: NotGivenOr[str] = NOT_GIVEN):
+        held, self._held_turn = self._held_turn, None
+        if held is not None:
+            super().start_user_activity()
+            for frame in held:
+                super().push_audio(frame)
+        return super().generate_reply(instructions=instructions)
+
+
+class FaqRealtimeModel(google.beta.realtime.RealtimeModel):
+    """Gemini with manual turns, answering only the turns the agent passes on"""
+
+    def session(self) -> HeldTurnRealtimeSession:
+        return HeldTurnRealtimeSession(self)
+
+
+def build_realtime_model():
+    if FAQ_CACHE_ENABLED:
+        # Gemini must not reply on its own; the agent decides when a turn ends
+        return FaqRealtimeModel(
+            voice=VOICE,
+            realtime_input_config=genai_types.RealtimeInputConfig(
+                automatic_activity_detection=genai_types.AutomaticActivityDetection(disabled=True),
+            ),
         )
+    return google.beta.realtime.RealtimeModel(voice=VOICE)
+
+
+def prewarm(proc: agents.JobProcess):
+    """Load what every session needs once per worker process, before a job arrives.
+
+    LiveKit runs this in each idle job process, so a visitor's job starts
+    with the plugins imported, the noise-cancellation models read, the
+    knowledge base indexed, the realtime model built and the cached greeting
+    (if any) in memory. Phase timings are logged and kept in userdata.
+    """
+    timings = {"imports": IMPORT_SECONDS}
+
+    started = time.perf_counter()
+    filters = {
+        "bvc": noise_cancellation.BVC(),
+        "bvc_telephony": noise_cancellation.BVCTelephony(),
+    }
+    # The native filter needs a room to initialise, so read the model files
+    # now and let its first load come from memory instead of disk
+    for options in filters.values():
+        _read_file(options.options["modelPath"])
+    timings["noise_cancellation"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    proc.userdata["knowledge"] = KnowledgeBase.load(KNOWLEDGE_FILE)
+    timings["knowledge_base"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    proc.userdata["llm"] = build_realtime_model()
+    timings["realtime_model"] = time.perf_counter() - started
+
+    if FAQ_CACHE_ENABLED:
+        from livekit.plugins import silero
+
+        started = time.perf_counter()
+        proc.userdata["vad"] = silero.VAD.load()
+        timings["vad"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        proc.userdata["faq_matcher"] = FaqMatcher.load(FAQ_FILE, FAQ_MATCH_THRESHOLD)
+        proc.userdata["answer_cache"] = AnswerCache(
+            FAQ_CACHE_FILE, FAQ_CACHE_MAX_ENTRIES, FAQ_CACHE_MAX_AGE_HOURS * 3600
+        )
+        timings["faq_cache"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    proc.userdata["greeting"] = greeting_cache.load(VOICE, GREETING_VERSION)
+    timings["greeting_cache"] = time.perf_counter() - started
+
+    proc.userdata["noise_cancellation"] = filters
+    proc.userdata["prewarm_timings"] = timings
+    logger.info(
+        "worker prewarmed: " + format_timings(timings),
+        extra={"pid": proc.pid},
+    )
+
+
+class SthreeAI(Agent):
+    def __init__(self, knowledge: KnowledgeBase, faq=None) -> None:
+        super().__init__(instructions=INSTRUCTIONS)
+        self.knowledge = knowledge
+        self.faq = faq
+
+    @function_tool(name=KNOWLEDGE_TOOL)
+    async def search_knowledge_base(self, context: RunContext, query: str) -> str:
+        """Look up facts about Iron Lady: its programs, founders, mission, methods,
+        masterclasses, enrollment, the book and the workplace challenges it addresses.
+
+        Args:
+            query: What the visitor wants to know, in a few words
+        """
+        return self.knowledge.lookup(query)
+
+    async def on_user_turn_completed(self, turn_ctx, new_message):
+        """Answer a cached FAQ without a model round-trip"""
+        if self.faq is None:
+            return
+        answer = self.faq.lookup(new_message.text_content)
+        if answer is None:
+            return
+
+        # The model never heard this turn; drop it so it is not answered later
+        self.realtime_llm_session.clear_audio()
+
+        # Give the model the question as text so later turns have context
+        chat_ctx = self.chat_ctx.copy()
+        chat_ctx.items.append(new_message)
+        await self.update_chat_ctx(chat_ctx)
+
+        handle = self.session.say(answer.text, audio=answer.frames())
+        handle.add_done_callback(lambda _: asyncio.ensure_future(sync_model_context(self)))
+        raise StopResponse()
+
+
+def speech_text(handle):
+    return " ".join(
+        item.text_content for item in handle.chat_items
+        if item.type == "message" and item.role == "assistant" and item.text_content
     )
 
+
+async def sync_model_context(agent: Agent):
+    """Copy what the agent said via say() into the realtime model's context"""
+    try:
+        await agent.update_chat_ctx(agent.chat_ctx.copy())
+    except Exception as e:
+        logger.warning(f"could not update the model context: {e}")
+
+
+async def play_cached_greeting(session: AgentSession, agent: Agent, greeting):
+    """Play the stored greeting, then tell the realtime model it was said"""
+    await session.say(greeting.text, audio=greeting.frames())
+
+    # say() only adds the text to the agent's history; the model needs it too
+    # or it would greet the visitor again on their first turn
+    await sync_model_context(agent)
+
+
+async def greet_live(session: AgentSession, recorder):
+    """Have the model greet the visitor, keeping the audio for the cache"""
+    if recorder is None:
+        await session.generate_reply(instructions=GREETING_INSTRUCTIONS)
+        return
+
+    token = recorder.start()
+    handle = session.generate_reply(instructions=GREETING_INSTRUCTIONS)
+    await handle
+
+    greeting = recorder.stop(token, speech_text(handle))
+    if greeting is not None and not handle.interrupted:
+        greeting_cache.save(VOICE, GREETING_VERSION, greeting)
+        logger.info(f"greeting cached: {VOICE} {GREETING_VERSION} ({greeting.duration:.1f}s)")
+
+
+class FaqResponder:
+    """Looks up FAQ answers and records the model's answer to the ones not cached yet"""
+
+    def __init__(self, matcher: FaqMatcher, cache: AnswerCache, recorder, version):
+        self.matcher = matcher
+        self.cache = cache
+        self.recorder = recorder
+        self.version = version
+        self._pending = None
+
+    def lookup(self, transcript):
+        """The cached answer (RecordedSpeech) to `transcript`, if it is an FAQ we have heard"""
+        self._pending = None
+        match = self.matcher.match(transcript)
+        if match is None:
+            self.cache.count("unmatched")
+            return None
+
+        key = AnswerCache.key(match.faq_id, VOICE, self.version)
+        answer = self.cache.get(key)
+        if answer is None and self.recorder is not None:
+            # The model answers this one; keep its reply for next time
+            self._pending = (match.faq_id, key)
+        return answer
+
+    def on_speech_created(self, ev):
+        if self._pending is None or ev.source != "generate_reply":
+            return
+        faq_id, key = self._pending
+        self._pending = None
+        token = self.recorder.start()
+        ev.speech_handle.add_done_callback(lambda handle: self._store(handle, token, faq_id, key))
+
+    def _store(self, handle, token, faq_id, key):
+        answer = self.recorder.stop(token, speech_text(handle))
+        # Replies that used any other tool depend on more than the question
+        if answer is None or handle.interrupted or any(
+            item.type != "message" and getattr(item, "name", None) != KNOWLEDGE_TOOL for item in handle.chat_items
+        ):
+            return
+        self.cache.put(key, faq_id, answer)
+        logger.info(f"answer cached: {faq_id} ({answer.duration:.1f}s)")
+
+
+server = AgentServer(setup_fnc=prewarm, load_fnc=worker_load, load_threshold=LOAD_THRESHOLD)
+
+@server.rtc_session(agent_name=AGENT_NAME)
+async def my_agent(ctx: agents.JobContext):
+    job_started = time.perf_counter()
+    timings = {}
+    filters = ctx.proc.userdata["noise_cancellation"]
+
+    knowledge = ctx.proc.userdata["knowledge"]
+    agent = SthreeAI(knowledge)
+    if FAQ_CACHE_ENABLED:
+        session = AgentSession(
+            llm=ctx.proc.userdata["llm"],
+            stt=google.STT(),
+            vad=ctx.proc.userdata["vad"],
+            turn_detection="vad",
+        )
+    else:
+        session = AgentSession(llm=ctx.proc.userdata["llm"])
+
+    @session.on("agent_state_changed")
+    def on_agent_state_changed(ev):
+        # Time to first greeting: job start until the agent starts talking
+        if ev.new_state == "speaking" and "first_audio" not in timings:
+            timings["first_audio"] = time.perf_counter() - job_started
+            logger.info(
+                "session timings: " + format_timings(timings),
+                extra={"room": ctx.room.name, "greeting": "cached" if ctx.proc.userdata.get("greeting") else "live"},
+            )
+
+    started = time.perf_counter()
     await session.start(
         room=ctx.room,
-        agent=SthreeAI(),
+        agent=agent,
         room_options=room_io.RoomOptions(
             audio_input=room_io.AudioInputOptions(
-                noise_cancellation=lambda params: noise_cancellation.BVCTelephony() if params.participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_SIP else noise_cancellation.BVC(),
+                noise_cancellation=lambda params: filters["bvc_telephony"] if params.participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_SIP else filters["bvc"],
             ),
         ),
     )
+    timings["session_start"] = time.perf_counter() - started
 
-    await session.generate_reply(
-        instructions="Greet the user warmly. Introduce yourself as Sthree AI, the voice assistant for Iron Lady. Briefly mention that you're here to help with information about leadership programs for women, and ask how you can assist them today."
-    )
+    # Keeps a copy of agent audio for the greeting and answer caches
+    recorder = None
+    if session.output.audio is not None:
+        recorder = SpeechRecorder(session.output.audio)
+        session.output.audio = recorder
+
+    if FAQ_CACHE_ENABLED:
+        # Cached answers are only valid for the instructions and facts they were given
+        version = prompt_version(INSTRUCTIONS + knowledge.version)
+        agent.faq = FaqResponder(ctx.proc.userdata["faq_matcher"], ctx.proc.userdata["answer_cache"], recorder, version)
+        session.on("speech_created", agent.faq.on_speech_created)
+
+        async def log_faq_stats():
+            logger.info("faq cache: " + ", ".join(f"{name} {value}" for name, value in agent.faq.cache.stats().items()))
+
+        ctx.add_shutdown_callback(log_faq_stats)
+
+    # A worker started before the greeting was first cached can still use it
+    greeting = ctx.proc.userdata.get("greeting") or greeting_cache.load(VOICE, GREETING_VERSION)
+    if greeting is not None:
+        ctx.proc.userdata["greeting"] = greeting
+        await play_cached_greeting(session, agent, greeting)
+    else:
+        await greet_live(session, recorder)
 
 
 if __name__ == "__main__":
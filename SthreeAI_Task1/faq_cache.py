@@ -0,0 +1,267 @@
+"""
+Sthree AI - FAQ Answer Cache
+Matches what a caller said against the questions in faq.json and, when the
+answer to that question has been heard before, replays it from a local
+cache instead of asking the realtime model again.
+
+Answers are the model's own spoken replies (audio plus transcript),
+recorded the first time a question is asked. They live in a small SQLite
+file shared by every agent process on the machine, with LRU and age
+eviction and hit-rate counters.
+
+    python faq_cache.py            # show hit rate and cached answers
+    python faq_cache.py --clear    # drop every cached answer
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from difflib import SequenceMatcher
+
+from speech import RecordedSpeech
+
+DEFAULT_FAQ_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'faq.json')
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'answer_cache.db')
+
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_MAX_ENTRIES = 200
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+# Spoken fillers that carry no meaning for matching
+FILLER_WORDS = frozenset((
+    'um', 'umm', 'uh', 'uhh', 'uhm', 'er', 'erm', 'hmm', 'ah', 'oh',
+    'please', 'okay', 'ok', 'so', 'well', 'hey', 'hi', 'hello', 'just',
+    'actually', 'basically', 'like', 'sthree',
+))
+
+# Polite lead-ins stripped from the start of a question
+LEAD_INS = (
+    'can you tell me ', 'could you tell me ', 'can you explain ', 'could you explain ',
+    'i want to know ', 'i would like to know ', 'i d like to know ', 'do you know ',
+    'i wanted to ask ', 'i want to ask ',
+)
+
+# Words that flip or redirect a question: "what programs do you not offer"
+# reads almost like "what programs do you offer" but must not share its
+# answer. A transcript using one that the variant lacks never matches it.
+NEGATIONS = frozenset((
+    'not', 'no', 'never', 'nor', 'without', 'except', 'besides', 'apart', 'instead', 'other', 'but',
+    't', 'dont', 'doesnt', 'isnt', 'arent', 'cant', 'cannot', 'wont', 'didnt', 'havent', 'hasnt',
+))
+
+# Question words, with "which" asking the same thing as "what"
+QUESTION_WORDS = {
+    'what': 'what', 'which': 'what', 'who': 'who', 'whom': 'who', 'when': 'when',
+    'where': 'where', 'why': 'why', 'how': 'how',
+}
+
+COUNTERS = ('hits', 'misses', 'unmatched', 'evicted_lru', 'evicted_age')
+
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation, drop fillers and lead-ins, collapse spaces"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    words = re.sub(r'[^a-z0-9]+', ' ', text).split()
+    text = ' '.join(word for word in words if word not in FILLER_WORDS) + ' '
+    for lead_in in LEAD_INS:
+        if text.startswith(lead_in):
+            text = text[len(lead_in):]
+            break
+    return text.strip()
+
+
+def guard_words(text):
+    """The negations and question words in normalized `text`"""
+    words = set()
+    for word in text.split():
+        if word in NEGATIONS:
+            words.add(word)
+        elif word in QUESTION_WORDS:
+            words.add(QUESTION_WORDS[word])
+    return frozenset(words)
+
+
+class FaqMatch(object):
+    def __init__(self, faq_id, score, variant):
+        self.faq_id = faq_id
+        self.score = score
+        self.variant = variant
+
+
+class FaqMatcher(object):
+    """Finds the FAQ a transcript asks, by similarity to each question variant"""
+
+    def __init__(self, questions, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._variants = []
+        for question in questions:
+            for variant in question['variants']:
+                normalized = normalize(variant)
+                if normalized:
+                    self._variants.append((normalized, guard_words(normalized), question['id']))
+
+    @classmethod
+    def load(cls, path=DEFAULT_FAQ_FILE, threshold=DEFAULT_THRESHOLD):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)['questions'], threshold)
+
+    def match(self, transcript):
+        """The best FaqMatch at or above the threshold, or None"""
+        text = normalize(transcript)
+        if not text:
+            return None
+
+        guards = guard_words(text)
+        best = None
+        matcher = SequenceMatcher(autojunk=False)
+        matcher.set_seq2(text)
+        for variant, variant_guards, faq_id in self._variants:
+            # Similar wording, different question
+            if not guards <= variant_guards:
+                continue
+            matcher.set_seq1(variant)
+            # quick_ratio() is a cheap upper bound on ratio()
+            if matcher.quick_ratio() < self.threshold:
+                continue
+            score = matcher.ratio()
+            if score >= self.threshold and (best is None or score > best.score):
+                best = FaqMatch(faq_id, score, variant)
+        return best
+
+
+class AnswerCache(object):
+    """Recorded answers keyed by FAQ id and answer version, in SQLite.
+
+    `max_entries` bounds the cache (least recently used answers go first)
+    and answers older than `max_age` seconds are re-recorded, so they track
+    changes to the programs the model describes.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_entries=DEFAULT_MAX_ENTRIES, max_age=DEFAULT_MAX_AGE_SECONDS):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._db = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode = WAL')
+        self._db.execute('PRAGMA synchronous = NORMAL')
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                faq_id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                sample_rate INTEGER NOT NULL,
+                num_channels INTEGER NOT NULL,
+                audio BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS ix_answers_last_used_at ON answers (last_used_at);
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        """)
+
+    @staticmethod
+    def key(faq_id, voice, version):
+        return f"{faq_id}:{voice}:{version}"
+
+    def count(self, name, amount=1):
+        self._db.execute(
+            'INSERT INTO counters (name, value) VALUES (?, ?) '
+            'ON CONFLICT (name) DO UPDATE SET value = value + excluded.value',
+            (name, amount)
+        )
+
+    def get(self, key):
+        """The cached RecordedSpeech for `key`, counting a hit or a miss"""
+        now = time.time()
+        row = self._db.execute(
+            'SELECT text, audio, sample_rate, num_channels, created_at FROM answers WHERE key = ?', (key,)
+        ).fetchone()
+        if row is not None and row[4] < now - self.max_age:
+            self._db.execute('DELETE FROM answers WHERE key = ?', (key,))
+            self.count('evicted_age')
+            row = None
+        if row is None:
+            self.count('misses')
+            return None
+
+        self._db.execute('UPDATE answers SET last_used_at = ?, hits = hits + 1 WHERE key = ?', (now, key))
+        self.count('hits')
+        return RecordedSpeech(row[0], row[1], row[2], row[3])
+
+    def put(self, key, faq_id, speech):
+        now = time.time()
+        with self._db:
+            self._db.execute('BEGIN IMMEDIATE')
+            self._db.execute(
+                'INSERT OR REPLACE INTO answers '
+                '(key, faq_id, text, sample_rate, num_channels, audio, created_at, last_used_at, hits) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)',
+                (key, faq_id, speech.text, speech.sample_rate, speech.num_channels, speech.pcm, now, now)
+            )
+            self.evict(now)
+
+    def evict(self, now=None):
+        """Drop answers past max_age, then the least recently used beyond max_entries"""
+        now = now or time.time()
+        expired = self._db.execute('DELETE FROM answers WHERE created_at < ?', (now - self.max_age,)).rowcount
+        overflow = self._db.execute(
+            'DELETE FROM answers WHERE key IN ('
+            'SELECT key FROM answers ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        ).rowcount
+        if expired:
+            self.count('evicted_age', expired)
+        if overflow:
+            self.count('evicted_lru', overflow)
+
+    def clear(self):
+        self._db.execute('DELETE FROM answers')
+        self._db.execute('DELETE FROM counters')
+
+    def stats(self):
+        values = dict(self._db.execute('SELECT name, value FROM counters').fetchall())
+        stats = {name: values.get(name, 0) for name in COUNTERS}
+        lookups = stats['hits'] + stats['misses']
+        turns = lookups + stats['unmatched']
+        stats['entries'] = self._db.execute('SELECT COUNT(*) FROM answers').fetchone()[0]
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['turn_hit_rate'] = round(stats['hits'] / turns, 3) if turns else 0.0
+        return stats
+
+    def entries(self):
+        return self._db.execute(
+            'SELECT faq_id, key, hits, created_at, last_used_at, length(audio) FROM answers ORDER BY last_used_at DESC'
+        ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or clear the Sthree AI FAQ answer cache')
+    parser.add_argument('--cache', default=os.getenv('FAQ_CACHE_FILE', DEFAULT_CACHE_FILE), help='Cache file')
+    parser.add_argument('--clear', action='store_true', help='Delete every cached answer and reset the counters')
+    args = parser.parse_args()
+
+    cache = AnswerCache(args.cache)
+    if args.clear:
+        cache.clear()
+        print("🧹 Answer cache cleared")
+        return
+
+    stats = cache.stats()
+    print(f"📊 Hit rate {stats['hit_rate']:.1%} of FAQ questions, {stats['turn_hit_rate']:.1%} of all turns")
+    print(f"   hits {stats['hits']}, misses {stats['misses']}, not an FAQ {stats['unmatched']}, "
+          f"evicted {stats['evicted_lru']} (LRU) / {stats['evicted_age']} (age), cached {stats['entries']}")
+    for faq_id, key, hits, created_at, last_used_at, size in cache.entries():
+        age_hours = (time.time() - created_at) / 3600
+        print(f"   {faq_id:<24} {hits:>5} hits  {size / 1024:>7.0f} KB  {age_hours:>6.1f} h old  ({key})")
+
+
+if __name__ == '__main__':
+    main()
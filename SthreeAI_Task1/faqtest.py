@@ -0,0 +1,127 @@
+"""
+Sthree AI - FAQ Turn Test
+Plays a cached FAQ question followed by one the cache cannot answer through
+the agent's realtime session, and checks what would be sent to Gemini: the
+cached turn must not be sent at all, and the next reply must be asked for
+over the second question's audio only. Then does the same with the caller
+talking over the agent, which must reach Gemini as an interruption straight
+away. Runs offline; nothing connects to Gemini. Run it after upgrading
+livekit-plugins-google.
+
+    python faqtest.py
+"""
+
+import asyncio
+import os
+import sys
+
+from google.genai import types as genai_types
+from livekit import rtc
+
+os.environ.setdefault('GOOGLE_API_KEY', 'offline')
+os.environ['FAQ_CACHE_ENABLED'] = '1'
+
+import agent
+from faq_cache import AnswerCache, FaqMatcher
+from speech import RecordedSpeech
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = SAMPLE_RATE // 20  # 50 ms, one chunk per frame
+
+
+class RecordingSession(agent.HeldTurnRealtimeSession):
+    """The agent's session with the Gemini connection replaced by a list"""
+
+    def __init__(self, realtime_model):
+        super().__init__(realtime_model)
+        self._main_atask.cancel()
+        self.sent = []
+
+    def _send_client_event(self, event):
+        self.sent.append(event)
+
+
+def frame(value):
+    return rtc.AudioFrame(bytes([value]) * FRAME_SAMPLES * 2, SAMPLE_RATE, 1, FRAME_SAMPLES)
+
+
+def describe(event):
+    if isinstance(event, genai_types.LiveClientContent):
+        return 'content'
+    if event.activity_start:
+        return 'activity_start'
+    if event.activity_end:
+        return 'activity_end'
+    return 'audio:' + str(event.media_chunks[0].data[0])
+
+
+def speak(session, value, frames, barge_in=False):
+    """A visitor's turn as AgentActivity drives it: VAD opens the activity, audio follows"""
+    if barge_in:
+        session.interrupt()
+    session.start_user_activity()
+    for _ in range(frames):
+        session.push_audio(frame(value))
+
+
+def answer(session, responder, transcript):
+    """What SthreeAI.on_user_turn_completed does with a finished turn"""
+    if responder.lookup(transcript) is not None:
+        session.clear_audio()
+        return 'cache'
+    session.generate_reply().cancel()
+    return 'model'
+
+
+async def run():
+    cache = AnswerCache(':memory:')
+    responder = agent.FaqResponder(FaqMatcher.load(agent.FAQ_FILE), cache, None, 'test')
+    cache.put(AnswerCache.key('programs', agent.VOICE, 'test'), 'programs', RecordedSpeech('Our programs...', b'\0\0', SAMPLE_RATE, 1))
+
+    session = RecordingSession(agent.build_realtime_model())
+    failures = []
+    try:
+        speak(session, 1, 20)
+        answered = answer(session, responder, 'What programs do you offer?')
+        if answered != 'cache' or session.sent:
+            failures.append(f"cached turn: answered by {answered}, sent {[describe(e) for e in session.sent]}")
+
+        speak(session, 2, 30)
+        answered = answer(session, responder, 'How much do the programs cost?')
+        sent = [describe(e) for e in session.sent]
+        expected = ['activity_start'] + ['audio:2'] * 30 + ['activity_end', 'content']
+        if answered != 'model' or sent != expected:
+            failures.append(f"model turn: answered by {answered}, sent {sent}")
+
+        # The caller talks over the reply with a cached question, then asks a new one
+        session.sent.clear()
+        speak(session, 3, 20, barge_in=True)
+        answered = answer(session, responder, 'What programs do you offer?')
+        sent = [describe(e) for e in session.sent]
+        if answered != 'cache' or sent != ['activity_start']:
+            failures.append(f"cached barge-in: answered by {answered}, sent {sent}")
+
+        session.sent.clear()
+        speak(session, 4, 30, barge_in=True)
+        answered = answer(session, responder, 'Where are the masterclasses held?')
+        sent = [describe(e) for e in session.sent]
+        expected = ['audio:4'] * 30 + ['activity_end', 'content']
+        if answered != 'model' or sent != expected:
+            failures.append(f"model barge-in: answered by {answered}, sent {sent}")
+    finally:
+        await session.aclose()
+
+    print(f"📊 {cache.stats()}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print('✅ Cached turns kept from Gemini; replies cover only the new question; barge-ins interrupt at once')
+    return not failures
+
+
+def main():
+    sys.exit(0 if asyncio.run(run()) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Sthree AI - Greeting Cache
+The greeting is the same for every visitor, so the first one spoken live
+is recorded (see speech.py) and stored as a WAV file plus its transcript
+under the voice and the greeting prompt's version. Later sessions play the
+stored audio as soon as they start instead of waiting on a realtime model
+round-trip.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import wave
+
+from speech import RecordedSpeech
+
+
+def prompt_version(instructions):
+    """Short hash of the greeting prompt; changing the prompt starts a new cache entry"""
+    return hashlib.sha1(instructions.encode('utf-8')).hexdigest()[:10]
+
+
+class GreetingCache(object):
+    """Greetings on disk, one WAV and one JSON file per (voice, version)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _base(self, voice, version):
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{voice}-{version}")
+        return os.path.join(self.directory, name)
+
+    def load(self, voice, version):
+        """The stored greeting as RecordedSpeech, or None if there is none (or it is unreadable)"""
+        base = self._base(voice, version)
+        try:
+            with open(base + '.json', 'r', encoding='utf-8') as f:
+                text = json.load(f)['text']
+            with wave.open(base + '.wav', 'rb') as f:
+                if f.getsampwidth() != 2:
+                    return None
+                return RecordedSpeech(text, f.readframes(f.getnframes()), f.getframerate(), f.getnchannels())
+        except (OSError, ValueError, KeyError, EOFError, wave.Error):
+            return None
+
+    def save(self, voice, version, greeting):
+        """Write atomically, so concurrent workers never read a half-written file"""
+        os.makedirs(self.directory, exist_ok=True)
+        base = self._base(voice, version)
+
+        fd, wav_tmp = tempfile.mkstemp(dir=self.directory, suffix='.wav.tmp')
+        with os.fdopen(fd, 'wb') as raw, wave.open(raw, 'wb') as f:
+            f.setnchannels(greeting.num_channels)
+            f.setsampwidth(2)
+            f.setframerate(greeting.sample_rate)
+            f.writeframes(greeting.pcm)
+        fd, json_tmp = tempfile.mkstemp(dir=self.directory, suffix='.json.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'text': greeting.text, 'voice': voice, 'version': version}, f)
+
+        # Audio first: load() reads the transcript first and needs both
+        os.replace(wav_tmp, base + '.wav')
+        os.replace(json_tmp, base + '.json')
@@ -0,0 +1,22 @@
+"""
+Sthree AI - Production server settings
+Run with: gunicorn server:app
+Token minting is CPU-bound, so throughput scales with worker processes;
+a few threads per worker cover the time spent waiting on clients.
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', '4'))
+keepalive = 5
+
+# Import server.py (and check its configuration) once in the master, before
+# forking, so a bad .env stops the deployment instead of every worker
+preload_app = True
+
+accesslog = None
+errorlog = '-'
@@ -0,0 +1,133 @@
+"""
+Sthree AI - Knowledge Base
+Iron Lady facts live in knowledge_base.json, one entry per topic. Each agent
+worker loads the file once into an in-memory inverted index, and the agent
+looks facts up through a function tool, so the prompt stays the same size
+however many programs, dates and testimonials are added.
+
+    python knowledge.py "who started iron lady"
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+DEFAULT_KNOWLEDGE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge_base.json')
+
+DEFAULT_LIMIT = 3
+
+# Words in titles and tags count this many times over words in the text
+FIELD_BOOST = 3
+
+# Results scoring below this share of the best one are left out
+MIN_RELATIVE_SCORE = 0.25
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+STOP_WORDS = frozenset((
+    'a', 'about', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for', 'from',
+    'how', 'i', 'in', 'is', 'it', 'its', 'me', 'my', 'of', 'on', 'or', 'tell', 'that', 'the',
+    'their', 'there', 'this', 'to', 'was', 'what', 'when', 'where', 'which', 'who', 'with', 'you',
+    'your',
+))
+
+
+def _stem(word):
+    """Fold simple plurals: programs -> program, masterclasses -> masterclass"""
+    if len(word) > 4 and word.endswith('es') and word[-3] in 'sxh':
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return [_stem(word) for word in re.findall(r'[a-z0-9]+', text) if word not in STOP_WORDS]
+
+
+class KnowledgeEntry(object):
+    def __init__(self, entry_id, title, text, tags=()):
+        self.id = entry_id
+        self.title = title
+        self.text = text
+        self.tags = list(tags)
+
+
+class KnowledgeBase(object):
+    """Entries indexed by term for BM25 search"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self._postings = defaultdict(list)
+        self._lengths = []
+        for index, entry in enumerate(entries):
+            terms = Counter(tokenize(entry.text))
+            for term in tokenize(' '.join([entry.title] + entry.tags)):
+                terms[term] += FIELD_BOOST
+            for term, frequency in terms.items():
+                self._postings[term].append((index, frequency))
+            self._lengths.append(sum(terms.values()))
+        self._average_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        self.version = hashlib.sha1(
+            json.dumps([(e.id, e.title, e.text, e.tags) for e in entries], sort_keys=True).encode('utf-8')
+        ).hexdigest()[:10]
+
+    @classmethod
+    def load(cls, path=DEFAULT_KNOWLEDGE_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls([
+            KnowledgeEntry(entry['id'], entry['title'], entry['text'], entry.get('tags', ()))
+            for entry in data['entries']
+        ])
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """The best `limit` entries for `query` as (entry, score), best first"""
+        scores = defaultdict(float)
+        count = len(self.entries)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, frequency in postings:
+                norm = K1 * (1 - B + B * self._lengths[index] / self._average_length)
+                scores[index] += idf * frequency * (K1 + 1) / (frequency + norm)
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            (self.entries[index], score) for index, score in best
+            if score >= best[0][1] * MIN_RELATIVE_SCORE
+        ]
+
+    def lookup(self, query, limit=DEFAULT_LIMIT):
+        """Search results as short text for the model"""
+        results = self.search(query, limit)
+        if not results:
+            return 'Nothing in the Iron Lady knowledge base matches that.'
+        return '\n\n'.join(f"{entry.title}: {entry.text}" for entry, _ in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search the Sthree AI knowledge base')
+    parser.add_argument('query', help='What to look up')
+    parser.add_argument('--file', default=os.getenv('KNOWLEDGE_FILE', DEFAULT_KNOWLEDGE_FILE), help='Knowledge base file')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help='Entries to return')
+    args = parser.parse_args()
+
+    knowledge = KnowledgeBase.load(args.file)
+    print(f"📚 {len(knowledge.entries)} entries (version {knowledge.version})")
+    for entry, score in knowledge.search(args.query, args.limit):
+        print(f"   {score:6.2f}  {entry.id:<24} {entry.text}")
+
+
+if __name__ == '__main__':
+    main()
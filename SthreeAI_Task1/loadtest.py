@@ -0,0 +1,162 @@
+"""
+Sthree AI - Token Endpoint Load Test
+Hammers /api/token with keep-alive connections from several processes (so
+the client is not limited by one GIL) and reports tokens per second and
+latency percentiles. With --mint it times TokenMinter in-process instead,
+next to livekit.api.AccessToken for comparison.
+
+Usage:
+    gunicorn server:app &
+    python loadtest.py --url http://localhost:5000 --requests 20000
+    python loadtest.py --mint
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import time
+from threading import Thread
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies.sort()
+    return {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'tokens_per_second': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+# HTTP load
+def _client(url, count, latencies, errors):
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    path = (parts.path.rstrip('/') or '') + '/api/token'
+    connection = connection_class(parts.netloc, timeout=30)
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            body = response.read()
+            if response.status != 200 or b'"token"' not in body:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            connection.close()
+            connection = connection_class(parts.netloc, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+
+
+def _run_process(args):
+    url, threads, count = args
+    latencies = []
+    errors = []
+    per_thread = [count // threads + (1 if i < count % threads else 0) for i in range(threads)]
+    workers = [Thread(target=_client, args=(url, n, latencies, errors)) for n in per_thread if n]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies, len(errors)
+
+
+def run_http(url, total, processes, threads):
+    # Warm up connections and the server's first-request path
+    _client(url, min(50, total), [], [])
+
+    per_process = [total // processes + (1 if i < total % processes else 0) for i in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        started = time.perf_counter()
+        results = pool.map(_run_process, [(url, threads, n) for n in per_process])
+        elapsed = time.perf_counter() - started
+
+    latencies = [value for values, _ in results for value in values]
+    errors = sum(count for _, count in results)
+    return summarize(latencies, errors, elapsed)
+
+
+# In-process minting
+def _time_calls(function, count):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(count):
+        call_started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, 0, time.perf_counter() - started)
+
+
+def run_mint(total):
+    from tokens import TokenConfig, TokenMinter, new_room_name
+
+    config = TokenConfig('APIbenchmark', 'benchmark-secret-' + 'x' * 32, 'ws://localhost:7880')
+    minter = TokenMinter(config)
+    results = {'TokenMinter': _time_calls(lambda: minter.mint('user-0123abcd', new_room_name(config)), total)}
+
+    try:
+        from livekit import api
+    except ImportError:
+        return results
+
+    def access_token():
+        return api.AccessToken(config.api_key, config.api_secret).with_identity('user-0123abcd').with_name('User').with_grants(
+            api.VideoGrants(room_join=True, room=new_room_name(config), can_publish=True, can_subscribe=True)
+        ).with_room_config(
+            api.RoomConfiguration(agents=[api.RoomAgentDispatch(agent_name=config.agent_name)])
+        ).to_jwt()
+
+    results['livekit.api.AccessToken'] = _time_calls(access_token, total)
+    return results
+
+
+def print_result(label, result):
+    print(f"{label}: {result['tokens_per_second']:.0f} tokens/s over {result['requests']} requests "
+          f"({result['errors']} errors) | p50 {result['p50_ms']:.2f} ms  p95 {result['p95_ms']:.2f} ms  "
+          f"p99 {result['p99_ms']:.2f} ms  max {result['max_ms']:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Sthree AI token endpoint')
+    parser.add_argument('--url', default='http://localhost:5000', help='Server base URL')
+    parser.add_argument('--requests', type=int, default=10000, help='Total token requests')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='Client processes')
+    parser.add_argument('--threads', type=int, default=8, help='Keep-alive connections per client process')
+    parser.add_argument('--mint', action='store_true', help='Time token minting in-process instead of over HTTP')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    if args.mint:
+        results = run_mint(args.requests)
+        for label, result in results.items():
+            print_result(label, result)
+    else:
+        results = run_http(args.url, args.requests, args.processes, args.threads)
+        print_result(args.url + '/api/token', results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
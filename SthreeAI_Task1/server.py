@@ -1,12 +1,29 @@
 from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
-from livekit import api
+import json
 import os
+import sys
 from dotenv import load_dotenv
 import secrets
 
+from tokens import ConfigError, TokenMinter, load_config, new_room_name
+
 load_dotenv()
 
+# Configuration is read and checked once per process, at import, so a
+# misconfigured deployment fails at boot instead of on every token request
+try:
+    config = load_config()
+except ConfigError as e:
+    print(f"Error: {e}")
+    print("Please check your .env file")
+    sys.exit(1)
+
+minter = TokenMinter(config)
+
+# The url is the only part of the response that is the same for every request
+TOKEN_RESPONSE_URL = '","url":' + json.dumps(config.livekit_url) + ',"room":"'
+
 app = Flask(__name__, static_folder='static')
 CORS(app)
 
@@ -18,35 +35,16 @@ def index():
 def get_token():
     """Generate a token for the user to join the room"""
     try:
-        api_key = os.getenv("LIVEKIT_API_KEY")
-        api_secret = os.getenv("LIVEKIT_API_SECRET")
-        livekit_url = os.getenv("LIVEKIT_URL")
-        
-        if not api_key or not api_secret or not livekit_url:
-            return jsonify({"error": "Server configuration error"}), 500
-        
-        # Generate a unique room name or use a default
-        room_name = "sthree-ai-room"
-        
+        # Every visitor gets a new room; the token dispatches the agent to it
+        room_name = new_room_name(config)
+
         # Generate unique participant identity
         participant_id = f"user-{secrets.token_hex(4)}"
-        
-        token = api.AccessToken(api_key, api_secret)
-        token.with_identity(participant_id).with_name("User").with_grants(
-            api.VideoGrants(
-                room_join=True,
-                room=room_name,
-                can_publish=True,
-                can_subscribe=True,
-            )
-        )
-        
-        return jsonify({
-            "token": token.to_jwt(),
-            "url": livekit_url,
-            "room": room_name
-        })
-    
+        token = minter.mint(participant_id, room_name)
+
+        # Token and room name are base64url / hex, so they need no escaping
+        return app.response_class('{"token":"' + token + TOKEN_RESPONSE_URL + room_name + '"}\n', mimetype='application/json')
+
     except Exception as e:
         print(f"Error generating token: {e}")
         return jsonify({"error": str(e)}), 500
@@ -56,21 +54,14 @@ def health():
     return jsonify({"status": "ok"})
 
 if __name__ == '__main__':
-    # Check if required environment variables are set
-    required_vars = ['LIVEKIT_API_KEY', 'LIVEKIT_API_SECRET', 'LIVEKIT_URL']
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    
-    if missing_vars:
-        print(f"Error: Missing environment variables: {', '.join(missing_vars)}")
-        print("Please check your .env file")
-        exit(1)
-    
     print("\n" + "="*80)
     print("🎤 Sthree AI Server Starting...")
     print("="*80)
-    print(f"\n✅ LiveKit URL: {os.getenv('LIVEKIT_URL')}")
-    print(f"✅ API Key: {os.getenv('LIVEKIT_API_KEY')[:10]}...")
+    print(f"\n✅ LiveKit URL: {config.livekit_url}")
+    print(f"✅ API Key: {config.api_key[:10]}...")
+    print(f"✅ Agent: {config.agent_name or '(automatic dispatch)'}")
     print(f"\n🌐 Web UI will be available at: http://localhost:5000")
+    print("   (development server; use `gunicorn server:app` in production)")
     print("\n" + "="*80 + "\n")
-    
-    app.run(debug=True, host='0.0.0.0', port=5000)
+
+    app.run(debug=os.getenv("FLASK_DEBUG", "1") == "1", host='0.0.0.0', port=5000)
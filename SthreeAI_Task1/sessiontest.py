@@ -0,0 +1,91 @@
+"""
+Sthree AI - Concurrent Session Test
+Opens several visitor sessions at once, the way the web UI does (GET
+/api/token, then join the room), and measures how long each waits for the
+agent to be dispatched into its room. Meant for a local setup:
+
+    livekit-server --dev
+    LIVEKIT_URL=ws://localhost:7880 LIVEKIT_API_KEY=devkey LIVEKIT_API_SECRET=secret python agent.py dev
+    LIVEKIT_URL=ws://localhost:7880 LIVEKIT_API_KEY=devkey LIVEKIT_API_SECRET=secret python server.py
+    python sessiontest.py --sessions 10
+
+Start more agent.py processes to see conversations spread across them.
+"""
+
+import argparse
+import asyncio
+import time
+
+import aiohttp
+from livekit import rtc
+
+from loadtest import percentile
+
+
+async def visitor(http, server_url, hold, timeout):
+    async with http.get(server_url.rstrip('/') + '/api/token') as response:
+        data = await response.json()
+
+    room = rtc.Room()
+    agent_joined = asyncio.Event()
+    agents = set()
+
+    def on_participant(participant):
+        if participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_AGENT:
+            agents.add(participant.identity)
+            agent_joined.set()
+
+    room.on('participant_connected', on_participant)
+
+    started = time.perf_counter()
+    await room.connect(data['url'], data['token'])
+    for participant in room.remote_participants.values():
+        on_participant(participant)
+
+    try:
+        await asyncio.wait_for(agent_joined.wait(), timeout)
+        waited = time.perf_counter() - started
+    except asyncio.TimeoutError:
+        waited = None
+
+    await asyncio.sleep(hold)
+    await room.disconnect()
+    return data['room'], waited, len(agents)
+
+
+async def run(server_url, sessions, hold, timeout):
+    async with aiohttp.ClientSession() as http:
+        results = await asyncio.gather(
+            *[visitor(http, server_url, hold, timeout) for _ in range(sessions)],
+            return_exceptions=True
+        )
+
+    failures = [result for result in results if isinstance(result, Exception)]
+    finished = [result for result in results if not isinstance(result, Exception)]
+    waits = sorted(waited for _, waited, _ in finished if waited is not None)
+    rooms = {room for room, _, _ in finished}
+
+    print(f"Sessions: {sessions} | rooms: {len(rooms)} | agent joined: {len(waits)} | "
+          f"no agent: {len(finished) - len(waits)} | errors: {len(failures)}")
+    if waits:
+        print(f"Agent dispatch: p50 {percentile(waits, 0.50) * 1000:.0f} ms  "
+              f"p99 {percentile(waits, 0.99) * 1000:.0f} ms  max {waits[-1] * 1000:.0f} ms")
+    if any(count > 1 for _, _, count in finished):
+        print("⚠️  Some rooms got more than one agent")
+    for error in failures[:5]:
+        print(f"❌ {error!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Open concurrent Sthree AI sessions and time agent dispatch')
+    parser.add_argument('--url', default='http://localhost:5000', help='Web server base URL')
+    parser.add_argument('--sessions', type=int, default=5, help='Concurrent visitors')
+    parser.add_argument('--hold', type=float, default=5.0, help='Seconds each visitor stays after the agent joins')
+    parser.add_argument('--timeout', type=float, default=20.0, help='Seconds to wait for the agent')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.url, args.sessions, args.hold, args.timeout))
+
+
+if __name__ == '__main__':
+    main()
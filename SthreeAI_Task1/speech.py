@@ -0,0 +1,99 @@
+"""
+Sthree AI - Recorded Speech
+Keeps a copy of what the agent says so it can be replayed later without a
+model round-trip. Used by the greeting cache and the FAQ answer cache.
+"""
+
+from livekit import rtc
+from livekit.agents.voice import io
+
+# Playback chunk size; matches the frames the room audio output publishes
+FRAME_MS = 20
+
+# Anything shorter is a cut-off or failed reply, not worth keeping
+MIN_SPEECH_SECONDS = 1.0
+
+
+class RecordedSpeech(object):
+    """16-bit PCM audio and the text that was spoken"""
+
+    def __init__(self, text, pcm, sample_rate, num_channels):
+        self.text = text
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+
+    @property
+    def duration(self):
+        return len(self.pcm) / (2 * self.num_channels * self.sample_rate)
+
+    async def frames(self):
+        samples = self.sample_rate * FRAME_MS // 1000
+        step = samples * self.num_channels * 2
+        view = memoryview(self.pcm)
+        for offset in range(0, len(view), step):
+            chunk = view[offset:offset + step]
+            yield rtc.AudioFrame(chunk, self.sample_rate, self.num_channels, len(chunk) // (2 * self.num_channels))
+
+
+class SpeechRecorder(io.AudioOutput):
+    """Passes agent audio through to the room, keeping a copy between start() and stop().
+
+    Install it once in front of session.output.audio. start() returns a
+    token; stop() with an older token (someone else started recording since)
+    returns None. A recording that the visitor interrupted, or whose audio
+    format changes midway, is dropped.
+    """
+
+    def __init__(self, audio_output):
+        super(SpeechRecorder, self).__init__(
+            label='SpeechRecorder',
+            next_in_chain=audio_output,
+            sample_rate=audio_output.sample_rate,
+            capabilities=io.AudioOutputCapabilities(pause=True),
+        )
+        self.recording = False
+        self._chunks = []
+        self._format = None
+        self._usable = False
+        self._token = 0
+
+    def start(self):
+        self.recording = True
+        self._chunks = []
+        self._format = None
+        self._usable = True
+        self._token += 1
+        return self._token
+
+    def stop(self, token, text, min_seconds=MIN_SPEECH_SECONDS):
+        """The RecordedSpeech since start(), or None if it should not be kept"""
+        if token != self._token:
+            return None
+        self.recording = False
+        chunks, self._chunks = self._chunks, []
+        if not self._usable or not text or self._format is None:
+            return None
+        speech = RecordedSpeech(text, b''.join(chunks), *self._format)
+        return speech if speech.duration >= min_seconds else None
+
+    async def capture_frame(self, frame):
+        await super(SpeechRecorder, self).capture_frame(frame)
+        if self.recording and self._usable:
+            frame_format = (frame.sample_rate, frame.num_channels)
+            if self._format is None:
+                self._format = frame_format
+            if frame_format == self._format:
+                self._chunks.append(bytes(frame.data))
+            else:
+                self._usable = False
+        await self.next_in_chain.capture_frame(frame)
+
+    def flush(self):
+        super(SpeechRecorder, self).flush()
+        self.next_in_chain.flush()
+
+    def clear_buffer(self):
+        if self.recording:
+            self._usable = False
+        self.next_in_chain.clear_buffer()
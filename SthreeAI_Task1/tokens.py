@@ -0,0 +1,111 @@
+"""
+Sthree AI - LiveKit Access Tokens
+Configuration is read and checked once at startup. Tokens are signed with a
+keyed HMAC that is copied per request instead of rebuilt, and every part of
+the JWT that does not change between visitors is encoded ahead of time.
+The output is the same HS256 token that livekit.api.AccessToken produces.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+
+REQUIRED_VARS = ('LIVEKIT_API_KEY', 'LIVEKIT_API_SECRET', 'LIVEKIT_URL')
+
+# Same lifetime as livekit.api.AccessToken
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+
+# Name agent.py registers under; must match on both sides for dispatch
+DEFAULT_AGENT_NAME = 'sthree-ai'
+
+
+class ConfigError(Exception):
+    pass
+
+
+class TokenConfig(object):
+    def __init__(self, api_key, api_secret, livekit_url, ttl=DEFAULT_TTL_SECONDS, agent_name=DEFAULT_AGENT_NAME,
+                 room_prefix='sthree'):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.livekit_url = livekit_url
+        self.ttl = ttl
+        self.agent_name = agent_name
+        self.room_prefix = room_prefix
+
+
+def load_config(environ=os.environ):
+    """Read the LiveKit settings, raising ConfigError if any are missing"""
+    missing = [name for name in REQUIRED_VARS if not environ.get(name)]
+    if missing:
+        raise ConfigError(f"Missing environment variables: {', '.join(missing)}")
+
+    try:
+        ttl = int(environ.get('LIVEKIT_TOKEN_TTL', DEFAULT_TTL_SECONDS))
+    except ValueError:
+        raise ConfigError('LIVEKIT_TOKEN_TTL must be a number of seconds')
+    if ttl <= 0:
+        raise ConfigError('LIVEKIT_TOKEN_TTL must be positive')
+
+    room_prefix = environ.get('ROOM_PREFIX', 'sthree')
+    if not room_prefix.replace('-', '').replace('_', '').isalnum():
+        raise ConfigError('ROOM_PREFIX may only contain letters, digits, "-" and "_"')
+
+    return TokenConfig(
+        environ['LIVEKIT_API_KEY'],
+        environ['LIVEKIT_API_SECRET'],
+        environ['LIVEKIT_URL'],
+        ttl,
+        environ.get('LIVEKIT_AGENT_NAME', DEFAULT_AGENT_NAME),
+        room_prefix
+    )
+
+
+def new_room_name(config):
+    """A fresh room per conversation, so each gets its own agent job"""
+    return f"{config.room_prefix}-{secrets.token_hex(8)}"
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _json(value):
+    return json.dumps(value, separators=(',', ':'))
+
+
+class TokenMinter(object):
+    """Mints room-join tokens for visitors.
+
+    Claims match AccessToken.with_identity().with_name().with_grants(
+    VideoGrants(room_join=True, room=..., can_publish=True, can_subscribe=True)).
+    When the config names an agent, the token also carries a room
+    configuration that dispatches that agent as the visitor's join creates
+    the room, like .with_room_config(RoomConfiguration(agents=[...])).
+    """
+
+    def __init__(self, config, name='User'):
+        self.config = config
+        self.ttl = config.ttl
+        self._signing_input = _b64(_json({'alg': 'HS256', 'typ': 'JWT'}).encode('utf-8')) + b'.'
+        self._mac = hmac.new(config.api_secret.encode('utf-8'), digestmod=hashlib.sha256)
+        self._claims_head = '{"name":' + _json(name) + ',"video":{"roomJoin":true,"room":'
+        room_config = ''
+        if config.agent_name:
+            room_config = ',"roomConfig":' + _json({'agents': [{'agentName': config.agent_name}]})
+        self._claims_tail = (
+            ',"canPublish":true,"canSubscribe":true,"canPublishData":true}' + room_config.replace('%', '%%')
+            + ',"sub":%s,"iss":' + _json(config.api_key).replace('%', '%%') + ',"nbf":%d,"exp":%d}'
+        )
+
+    def mint(self, identity, room):
+        now = int(time.time())
+        claims = self._claims_head + _json(room) + self._claims_tail % (_json(identity), now, now + self.ttl)
+        signing_input = self._signing_input + _b64(claims.encode('utf-8'))
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return (signing_input + b'.' + _b64(mac.digest())).decode('ascii')
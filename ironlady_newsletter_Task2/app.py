@@ -1,33 +1,192 @@
-cd ironlady-newsletterfrom flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, Response, stream_with_context, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_mail import Mail, Message
+from sqlalchemy import bindparam, event, insert, inspect, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+import click
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 import anthropic
-import schedule
 import threading
 import time
 import json
+import queue
+import atexit
+import hashlib
+import re
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 
-load_dotenv(.env)
+from itsdangerous import URLSafeSerializer, BadSignature
+
+from delivery import DeliveryEngine, is_connection_error, is_throttling_error
+from ratelimit import SendScheduler
+import storage
+from personalize import TemplateCache
+from serialize import RowSerializer
+import compress
+import importer
+import metrics
+import migrations
+import tracking
+
+load_dotenv()
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'ironlady-secret-key-2026')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///newsletter.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('SQLALCHEMY_DATABASE_URI', storage.DEFAULT_DATABASE_URI)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# WAL + pragmas for SQLite, pooled connections with pre-ping for server databases
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = storage.engine_options(
+    app.config['SQLALCHEMY_DATABASE_URI'],
+    pool_size=int(os.getenv('DB_POOL_SIZE', 10)),
+    max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 20))
+)
+storage.enable_sqlite_pragmas()
+app.config['APP_BASE_URL'] = os.getenv('APP_BASE_URL', 'http://localhost:5000')  # used for links in emails
+app.config['TRACKING_ENABLED'] = os.getenv('TRACKING_ENABLED', 'true').lower() == 'true'
+app.config['TRACKING_FLUSH_SECONDS'] = float(os.getenv('TRACKING_FLUSH_SECONDS', 5))
+app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes; smaller bodies are sent as-is
+app.config['COMPRESS_LEVEL'] = 6
+app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'  # /metrics + instrumentation
+
+# AI generation result cache
+app.config['AI_CACHE_TTL_HOURS'] = float(os.getenv('AI_CACHE_TTL_HOURS', 24))
+app.config['AI_CACHE_MAX_ENTRIES'] = int(os.getenv('AI_CACHE_MAX_ENTRIES', 200))
+app.config['AI_MAX_CONCURRENCY'] = int(os.getenv('AI_MAX_CONCURRENCY', 4))  # parallel model calls for batch jobs
 
 # Email Configuration (using Gmail SMTP)
-app.config['MAIL_SERVER'] = 'smtp.gmail.com'
-app.config['MAIL_PORT'] = 587
-app.config['MAIL_USE_TLS'] = True
+app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
+app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
+app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', 'true').lower() == 'true'
 app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
 app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_USERNAME')
 
+# Delivery engine: concurrent workers sharing a pool of open SMTP connections
+app.config['MAIL_SEND_WORKERS'] = int(os.getenv('MAIL_SEND_WORKERS', 4))
+app.config['MAIL_POOL_SIZE'] = int(os.getenv('MAIL_POOL_SIZE', app.config['MAIL_SEND_WORKERS']))
+# Provider quotas (0 = unlimited); throttling replies slow the per-second rate down
+app.config['MAIL_RATE_PER_SECOND'] = float(os.getenv('MAIL_RATE_PER_SECOND', 0))
+app.config['MAIL_RATE_PER_MINUTE'] = int(os.getenv('MAIL_RATE_PER_MINUTE', 0))
+app.config['MAIL_RATE_PER_DAY'] = int(os.getenv('MAIL_RATE_PER_DAY', 0))
+app.config['MAIL_MAX_RETRIES'] = int(os.getenv('MAIL_MAX_RETRIES', 5))  # retries per message on 4xx replies
+# Auto-create a campaign for the 1st of every month at 9:00 AM
+app.config['MONTHLY_NEWSLETTER_ENABLED'] = os.getenv('MONTHLY_NEWSLETTER_ENABLED', 'false').lower() == 'true'
+app.config['SUBSCRIBER_BATCH_SIZE'] = int(os.getenv('SUBSCRIBER_BATCH_SIZE', 1000))  # rows per keyset page
+app.config['SUBSCRIBERS_PAGE_SIZE'] = 50
+app.config['SUBSCRIBERS_MAX_PAGE_SIZE'] = 500
+app.config['IMPORT_BATCH_SIZE'] = int(os.getenv('IMPORT_BATCH_SIZE', 1000))  # rows per import transaction
+app.config['IMPORT_MAX_ERRORS'] = 1000  # per-row errors kept in an import report
+
 db = SQLAlchemy(app)
 mail = Mail(app)
 
+# Compiled newsletter bodies, keyed by (template id, updated_at)
+template_cache = TemplateCache()
+unsubscribe_serializer = URLSafeSerializer(app.config['SECRET_KEY'], salt='unsubscribe')
+# Separate salts, so an open token is never accepted as a click token or vice versa
+open_tracking_serializer = URLSafeSerializer(app.config['SECRET_KEY'], salt='tracking-open')
+click_tracking_serializer = URLSafeSerializer(app.config['SECRET_KEY'], salt='tracking-click')
+# Shared by every send job so quotas hold across campaigns
+send_scheduler = SendScheduler(
+    per_second=app.config['MAIL_RATE_PER_SECOND'],
+    per_minute=app.config['MAIL_RATE_PER_MINUTE'],
+    per_day=app.config['MAIL_RATE_PER_DAY']
+)
+
+# Metrics
+# Scraped from /metrics in Prometheus text format
+metrics_registry = metrics.Registry()
+http_request_seconds = metrics_registry.histogram(
+    'newsletter_http_request_duration_seconds', 'Request latency, including streamed bodies',
+    ('method', 'route', 'status'))
+http_request_sql_queries = metrics_registry.histogram(
+    'newsletter_http_request_sql_queries', 'SQL statements executed per request',
+    ('route',), buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100, 250))
+http_request_sql_seconds = metrics_registry.histogram(
+    'newsletter_http_request_sql_seconds', 'Time spent in SQL per request', ('route',))
+sql_queries_total = metrics_registry.counter(
+    'newsletter_sql_queries_total', 'SQL statements executed', ('context',))
+sql_seconds_total = metrics_registry.counter(
+    'newsletter_sql_seconds_total', 'Time spent executing SQL statements', ('context',))
+smtp_send_seconds = metrics_registry.histogram(
+    'newsletter_smtp_send_duration_seconds', 'Latency of each SMTP send attempt', ('result',))
+smtp_errors_total = metrics_registry.counter(
+    'newsletter_smtp_errors_total', 'Failed SMTP send attempts', ('kind',))
+messages_total = metrics_registry.counter(
+    'newsletter_messages_total', 'Final outcome per recipient after retries', ('result',))
+ai_generation_seconds = metrics_registry.histogram(
+    'newsletter_ai_generation_duration_seconds', 'Latency of model calls for newsletter content', ('outcome',))
+ai_cache_requests_total = metrics_registry.counter(
+    'newsletter_ai_cache_requests_total', 'AI content lookups by cache result', ('result',))
+send_jobs_gauge = metrics_registry.gauge(
+    'newsletter_send_jobs', 'Send jobs by status', ('status',))
+send_job_queue_gauge = metrics_registry.gauge(
+    'newsletter_send_job_queue_depth', 'Send jobs waiting for the background runner')
+send_job_rate_gauge = metrics_registry.gauge(
+    'newsletter_send_job_rate', 'Combined messages per second of running send jobs')
+
+def record_smtp_attempt(seconds, error):
+    """DeliveryEngine on_attempt hook; runs on the sender threads"""
+    if error is None:
+        smtp_send_seconds.observe(seconds, result='ok')
+        return
+    smtp_send_seconds.observe(seconds, result='error')
+    if is_throttling_error(error):
+        kind = 'throttled'
+    elif is_connection_error(error):
+        kind = 'connection'
+    else:
+        kind = 'rejected'
+    smtp_errors_total.inc(kind=kind)
+
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop('query_started', time.perf_counter())
+    if has_request_context() and 'sql_queries' in g:
+        g.sql_queries += 1
+        g.sql_seconds += elapsed
+        context = 'request'
+    else:
+        context = 'background'
+    sql_queries_total.inc(context=context)
+    sql_seconds_total.inc(elapsed, context=context)
+
+def _start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.sql_queries = 0
+    g.sql_seconds = 0.0
+
+def _note_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+def _finish_request_metrics(error=None):
+    # Teardown runs after a streamed body has been fully sent
+    started = g.pop('request_started', None)
+    if started is None:
+        return
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    status = g.get('response_status', 500)
+    http_request_seconds.observe(time.perf_counter() - started, method=request.method, route=route, status=status)
+    http_request_sql_queries.observe(g.sql_queries, route=route)
+    http_request_sql_seconds.observe(g.sql_seconds, route=route)
+
+if app.config['METRICS_ENABLED']:
+    event.listen(Engine, 'before_cursor_execute', _sql_started)
+    event.listen(Engine, 'after_cursor_execute', _sql_finished)
+    app.before_request(_start_request_metrics)
+    app.after_request(_note_response_status)
+    app.teardown_request(_finish_request_metrics)
+
 # Database Models
 class Subscriber(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -37,6 +196,15 @@ class Subscriber(db.Model):
     status = db.Column(db.String(20), default='active')  # active, unsubscribed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Keyset pages filter on these columns and walk forward by id
+    __table_args__ = (
+        db.Index('ix_subscriber_status_id', 'status', 'id'),
+        db.Index('ix_subscriber_program_interest_id', 'program_interest', 'id'),
+        # Segment sends and counts: program + status walked by id, and signup-date ranges
+        db.Index('ix_subscriber_program_interest_status_id', 'program_interest', 'status', 'id'),
+        db.Index('ix_subscriber_status_created_at', 'status', 'created_at'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -69,15 +237,23 @@ class Campaign(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     template_id = db.Column(db.Integer, db.ForeignKey('newsletter_template.id'))
-    status = db.Column(db.String(20), default='draft')  # draft, scheduled, sent
-    scheduled_date = db.Column(db.DateTime)
+    status = db.Column(db.String(20), default='draft')  # draft, scheduled, sending, sent
+    scheduled_date = db.Column(db.DateTime)  # server local time, as entered in the UI
     sent_date = db.Column(db.DateTime)
     recipients_count = db.Column(db.Integer, default=0)
     opened_count = db.Column(db.Integer, default=0)
     clicked_count = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    segment_id = db.Column(db.Integer, db.ForeignKey('segment.id'))  # None: all active subscribers
     
     template = db.relationship('NewsletterTemplate', backref='campaigns')
+    segment = db.relationship('Segment')
+    
+    __table_args__ = (
+        db.Index('ix_campaign_created_at', 'created_at'),
+        # Scheduler: next due campaign is the first entry for status='scheduled'
+        db.Index('ix_campaign_status_scheduled_date', 'status', 'scheduled_date'),
+    )
     
     def to_dict(self):
         return {
@@ -90,14 +266,351 @@ class Campaign(db.Model):
             'recipients_count': self.recipients_count,
             'opened_count': self.opened_count,
             'clicked_count': self.clicked_count,
+            'segment_id': self.segment_id,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M')
+        }
+
+class Segment(db.Model):
+    """Campaign audience: a filter on program_interest, status and signup date"""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    program_interest = db.Column(db.String(100))  # None: any program
+    status = db.Column(db.String(20), default='active')
+    signed_up_after = db.Column(db.DateTime)
+    signed_up_before = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def fields(self):
+        return {
+            'program_interest': self.program_interest,
+            'status': self.status,
+            'signed_up_after': self.signed_up_after,
+            'signed_up_before': self.signed_up_before
+        }
+    
+    def criteria(self):
+        return segment_criteria(**self.fields())
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'program_interest': self.program_interest,
+            'status': self.status,
+            'signed_up_after': self.signed_up_after.strftime('%Y-%m-%d %H:%M') if self.signed_up_after else None,
+            'signed_up_before': self.signed_up_before.strftime('%Y-%m-%d %H:%M') if self.signed_up_before else None,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M')
+        }
+
+class SendJob(db.Model):
+    """Durable background send of one campaign; resumable from last_subscriber_id"""
+    id = db.Column(db.Integer, primary_key=True)
+    campaign_id = db.Column(db.Integer, db.ForeignKey('campaign.id'), nullable=False)
+    status = db.Column(db.String(20), default='queued')  # queued, running, completed, failed
+    total_count = db.Column(db.Integer, default=0)
+    sent_count = db.Column(db.Integer, default=0)
+    failed_count = db.Column(db.Integer, default=0)
+    last_subscriber_id = db.Column(db.Integer, default=0)  # every subscriber up to this id is done
+    rate = db.Column(db.Float, default=0.0)  # messages per second in the current run
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    owner = db.Column(db.String(100))  # process running the job
+    heartbeat_at = db.Column(db.DateTime)  # refreshed by the owner while the job runs
+    
+    # Deleting a campaign deletes its send history with it
+    campaign = db.relationship('Campaign', backref=db.backref('send_jobs', cascade='all, delete-orphan'))
+    
+    __table_args__ = (
+        # Latest job of a campaign, and the runner's restart scan
+        db.Index('ix_send_job_campaign_id_id', 'campaign_id', 'id'),
+        db.Index('ix_send_job_status', 'status'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'campaign_id': self.campaign_id,
+            'status': self.status,
+            'total': self.total_count,
+            'sent': self.sent_count,
+            'failed': self.failed_count,
+            'remaining': max(self.total_count - self.sent_count - self.failed_count, 0),
+            'rate': round(self.rate or 0.0, 2),
+            'error': self.error,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M'),
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M') if self.started_at else None,
+            'finished_at': self.finished_at.strftime('%Y-%m-%d %H:%M') if self.finished_at else None
+        }
+
+class Delivery(db.Model):
+    """Ledger entry: the latest outcome of sending one campaign to one subscriber"""
+    id = db.Column(db.Integer, primary_key=True)
+    campaign_id = db.Column(db.Integer, db.ForeignKey('campaign.id'), nullable=False)
+    subscriber_id = db.Column(db.Integer, db.ForeignKey('subscriber.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # sent, failed
+    attempts = db.Column(db.Integer, default=1)  # send runs that reached this recipient
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('campaign_id', 'subscriber_id', name='uq_delivery_campaign_subscriber'),
+        # Failed-recipient listing and "already sent?" checks during a send
+        db.Index('ix_delivery_campaign_status_subscriber', 'campaign_id', 'status', 'subscriber_id'),
+    )
+    
+    def to_dict(self, email=None):
+        return {
+            'subscriber_id': self.subscriber_id,
+            'email': email,
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.error,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M'),
+            'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M')
+        }
+
+class StatCounter(db.Model):
+    """Maintained dashboard aggregate (see Dashboard Counters below)"""
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+# Dashboard Counters
+# Kept current by the flush hook below (and by bulk inserts), so the
+# dashboard reads a handful of rows instead of counting whole tables.
+# 'version' changes whenever a subscriber or campaign does.
+STAT_COUNTERS = ('active_subscribers', 'total_campaigns', 'sent_campaigns', 'scheduled_campaigns', 'version')
+
+def _stat_contribution(obj, status):
+    if isinstance(obj, Subscriber):
+        return {'active_subscribers': int((status or 'active') == 'active')}
+    status = status or 'draft'
+    return {
+        'total_campaigns': 1,
+        'sent_campaigns': int(status == 'sent'),
+        'scheduled_campaigns': int(status == 'scheduled')
+    }
+
+def _committed_status(obj):
+    history = inspect(obj).attrs.status.history
+    return (history.deleted or history.unchanged or [None])[0]
+
+def adjust_stats(connection, deltas):
+    """Apply counter deltas atomically and bump the version"""
+    deltas = dict(deltas)
+    deltas['version'] = 1
+    for name, delta in deltas.items():
+        if delta:
+            connection.execute(
+                update(StatCounter).where(StatCounter.name == name).values(value=StatCounter.value + delta)
+            )
+
+@event.listens_for(db.session, 'after_flush')
+def track_stat_changes(session, flush_context):
+    deltas = {}
+    changed = False
+    
+    def add(contribution, sign):
+        for name, value in contribution.items():
+            deltas[name] = deltas.get(name, 0) + sign * value
+    
+    for obj in session.new:
+        if isinstance(obj, (Subscriber, Campaign)):
+            add(_stat_contribution(obj, obj.status), 1)
+            changed = True
+    for obj in session.deleted:
+        if isinstance(obj, (Subscriber, Campaign)):
+            add(_stat_contribution(obj, _committed_status(obj)), -1)
+            changed = True
+    for obj in session.dirty:
+        if isinstance(obj, (Subscriber, Campaign)) and session.is_modified(obj):
+            history = inspect(obj).attrs.status.history
+            if history.has_changes():
+                add(_stat_contribution(obj, (history.deleted or [None])[0]), -1)
+                add(_stat_contribution(obj, obj.status), 1)
+            changed = True
+    
+    if changed:
+        adjust_stats(session.connection(), deltas)
+
+def rebuild_stats():
+    """Recount every dashboard counter from the tables"""
+    counts = {
+        'active_subscribers': Subscriber.query.filter_by(status='active').count(),
+        'total_campaigns': Campaign.query.count(),
+        'sent_campaigns': Campaign.query.filter_by(status='sent').count(),
+        'scheduled_campaigns': Campaign.query.filter_by(status='scheduled').count()
+    }
+    version = db.session.get(StatCounter, 'version')
+    counts['version'] = (version.value + 1) if version else 1
+    
+    for name in STAT_COUNTERS:
+        counter = db.session.get(StatCounter, name)
+        if counter is None:
+            db.session.add(StatCounter(name=name, value=counts[name]))
+        else:
+            counter.value = counts[name]
+    db.session.commit()
+    return counts
+
+class GeneratedContent(db.Model):
+    """Cached AI newsletter, keyed by (topic, program focus, prompt version)"""
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), unique=True, nullable=False)
+    topic = db.Column(db.String(200))
+    program_focus = db.Column(db.String(100))
+    prompt_version = db.Column(db.Integer)
+    content = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class GenerationJob(db.Model):
+    """Batch of AI newsletter variants, one per program, generated in the background"""
+    id = db.Column(db.Integer, primary_key=True)
+    topic = db.Column(db.String(200), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    variants = db.relationship('GenerationVariant', backref='job', order_by='GenerationVariant.id')
+    
+    def to_dict(self):
+        statuses = [v.status for v in self.variants]
+        if all(status == 'queued' for status in statuses):
+            status = 'queued'
+        elif any(status in ('queued', 'running') for status in statuses):
+            status = 'running'
+        elif 'completed' not in statuses:
+            status = 'failed'
+        elif 'failed' in statuses:
+            status = 'partial'  # finished, some variants failed
+        else:
+            status = 'completed'
+        return {
+            'id': self.id,
+            'topic': self.topic,
+            'status': status,
+            'total': len(statuses),
+            'completed': statuses.count('completed'),
+            'failed': statuses.count('failed'),
+            'variants': [v.to_dict() for v in self.variants],
             'created_at': self.created_at.strftime('%Y-%m-%d %H:%M')
         }
 
+class GenerationVariant(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('generation_job.id'), nullable=False, index=True)
+    program_focus = db.Column(db.String(100))
+    status = db.Column(db.String(20), default='queued')  # queued, running, completed, failed
+    template_id = db.Column(db.Integer, db.ForeignKey('newsletter_template.id'))
+    cached = db.Column(db.Boolean, default=False)
+    error = db.Column(db.Text)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'program_focus': self.program_focus,
+            'status': self.status,
+            'template_id': self.template_id,
+            'cached': self.cached,
+            'error': self.error
+        }
+
+# Subscriber Queries
+def iter_subscribers(*criteria, columns=None, after_id=0, batch_size=None):
+    """Yield subscriber rows in id order, one keyset-paginated batch at a time.
+
+    Only `batch_size` rows are held at once, and plain column rows (not ORM
+    objects) are returned so nothing accumulates in the session.
+    """
+    columns = columns or (Subscriber.id, Subscriber.name, Subscriber.email, Subscriber.program_interest)
+    batch_size = batch_size or app.config['SUBSCRIBER_BATCH_SIZE']
+    
+    while True:
+        batch = db.session.query(*columns).filter(
+            Subscriber.id > after_id, *criteria
+        ).order_by(Subscriber.id).limit(batch_size).all()
+        if not batch:
+            return
+        yield from batch
+        if len(batch) < batch_size:
+            return
+        after_id = batch[-1].id
+
+# Segments
+def segment_criteria(program_interest=None, status='active', signed_up_after=None, signed_up_before=None):
+    """Subscriber filter expressions for a segment definition"""
+    criteria = [Subscriber.status == (status or 'active')]
+    if program_interest:
+        criteria.append(Subscriber.program_interest == program_interest)
+    if signed_up_after:
+        criteria.append(Subscriber.created_at >= signed_up_after)
+    if signed_up_before:
+        criteria.append(Subscriber.created_at < signed_up_before)
+    return criteria
+
+def parse_segment(data):
+    """Normalized segment fields from a request dict (raises ValueError on bad dates)"""
+    def date(field):
+        return datetime.fromisoformat(data[field]) if data.get(field) else None
+    
+    return {
+        'program_interest': data.get('program_interest') or None,
+        'status': data.get('status') or 'active',
+        'signed_up_after': date('signed_up_after'),
+        'signed_up_before': date('signed_up_before')
+    }
+
+def get_or_create_segment(fields):
+    segment = Segment.query.filter_by(**fields).first()
+    if segment is None:
+        parts = [fields['program_interest'] or 'All programs', fields['status']]
+        if fields['signed_up_after']:
+            parts.append(f"joined after {fields['signed_up_after']:%Y-%m-%d}")
+        if fields['signed_up_before']:
+            parts.append(f"joined before {fields['signed_up_before']:%Y-%m-%d}")
+        segment = Segment(name=' · '.join(parts), **fields)
+        db.session.add(segment)
+        db.session.flush()
+    return segment
+
+# Preview counts are reused until a subscriber or campaign changes (the
+# dashboard 'version' counter moves), so repeated previews cost one lookup.
+segment_count_cache = {}
+SEGMENT_COUNT_CACHE_SIZE = 256
+
+def count_segment(fields):
+    version = db.session.query(StatCounter.value).filter_by(name='version').scalar()
+    key = (tuple(sorted(fields.items())), version)
+    count = segment_count_cache.get(key)
+    if count is None:
+        count = db.session.query(db.func.count(Subscriber.id)).filter(*segment_criteria(**fields)).scalar()
+        if len(segment_count_cache) >= SEGMENT_COUNT_CACHE_SIZE:
+            segment_count_cache.clear()
+        segment_count_cache[key] = count
+    return count
+
 # AI Content Generation
+# Bump whenever the prompt below changes so cached results are not reused
+PROMPT_VERSION = 1
+
+anthropic_client = None
+anthropic_client_lock = threading.Lock()
+
+def get_anthropic_client():
+    """One shared client (and HTTP connection pool) for the whole process"""
+    global anthropic_client
+    if anthropic_client is None:
+        with anthropic_client_lock:
+            if anthropic_client is None:
+                anthropic_client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+    return anthropic_client
+
 def generate_newsletter_content(topic, program_focus=None):
     """Generate newsletter content using Claude AI"""
+    started = time.perf_counter()
     try:
-        client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+        client = get_anthropic_client()
         
         prompt = f"""Generate a professional monthly newsletter for Iron Lady, a leadership organization for women.
 
@@ -123,11 +636,189 @@ Make it professional and inspiring."""
             ]
         )
         
+        ai_generation_seconds.observe(time.perf_counter() - started, outcome='success')
         return message.content[0].text
     except Exception as e:
+        ai_generation_seconds.observe(time.perf_counter() - started, outcome='error')
         print(f"AI Generation Error: {e}")
         return None
 
+def ai_cache_key(topic, program_focus):
+    normalized = json.dumps([PROMPT_VERSION, ' '.join(topic.lower().split()), (program_focus or '').strip().lower()])
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def parse_topic(data):
+    """The newsletter topic from a request dict (raises ValueError unless it is a non-empty string)"""
+    topic = data.get('topic', 'Monthly Leadership Update')
+    if not isinstance(topic, str) or not topic.strip():
+        raise ValueError('topic must be a non-empty string')
+    return topic.strip()
+
+def get_newsletter_content(topic, program_focus=None, refresh=False):
+    """Return (content, cached), generating only on a cache miss or refresh"""
+    key = ai_cache_key(topic, program_focus)
+    now = datetime.utcnow()
+    entry = GeneratedContent.query.filter_by(cache_key=key).first()
+    
+    if entry and not refresh and now - entry.created_at < timedelta(hours=app.config['AI_CACHE_TTL_HOURS']):
+        entry.last_used_at = now
+        db.session.commit()
+        ai_cache_requests_total.inc(result='hit')
+        return entry.content, True
+    
+    ai_cache_requests_total.inc(result='refresh' if refresh else 'miss')
+    content = generate_newsletter_content(topic, program_focus)
+    if not content:
+        return None, False
+    
+    if entry is None:
+        entry = GeneratedContent(cache_key=key, topic=topic[:200], program_focus=program_focus,
+                                 prompt_version=PROMPT_VERSION)
+        db.session.add(entry)
+    entry.content = content
+    entry.created_at = entry.last_used_at = now
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent miss on the same prompt stored its result first; overwrite it with ours
+        db.session.rollback()
+        GeneratedContent.query.filter_by(cache_key=key).update({
+            'content': content, 'created_at': now, 'last_used_at': now
+        })
+        db.session.commit()
+    prune_ai_cache()
+    return content, False
+
+PROGRAMS = ['LEP', '1-Crore Club', '100 Board Members', 'MBW']
+
+# Shared by every batch job, so concurrent model calls stay bounded process-wide
+generation_executor = ThreadPoolExecutor(
+    max_workers=app.config['AI_MAX_CONCURRENCY'], thread_name_prefix='ai-generate'
+)
+
+def extract_subject(content, fallback):
+    """Pick the subject line out of generated HTML (first <h1> or 'Subject:' line)"""
+    match = re.search(r'<h1[^>]*>(.*?)</h1>', content, re.IGNORECASE | re.DOTALL) or \
+        re.search(r'Subject:\s*(.*?)\n', content)
+    if not match:
+        return fallback
+    subject = re.sub(r'<[^>]+>', '', match.group(1)).strip()
+    return subject[:200] or fallback
+
+def run_generation_variant(variant_id, refresh=False):
+    """Generate one program variant and save it as its own NewsletterTemplate"""
+    with app.app_context():
+        try:
+            variant = db.session.get(GenerationVariant, variant_id)
+            variant.status = 'running'
+            topic, program_focus = variant.job.topic, variant.program_focus
+            db.session.commit()
+            
+            content, cached = get_newsletter_content(topic, program_focus, refresh=refresh)
+            variant = db.session.get(GenerationVariant, variant_id)
+            if content:
+                template = NewsletterTemplate(
+                    title=f"AI Generated: {topic} ({program_focus})"[:200],
+                    subject=extract_subject(content, f"{topic} - Iron Lady Newsletter"[:200]),
+                    content=content
+                )
+                db.session.add(template)
+                db.session.flush()
+                variant.template_id = template.id
+                variant.cached = cached
+                variant.status = 'completed'
+            else:
+                variant.status = 'failed'
+                variant.error = 'Failed to generate content'
+            variant.finished_at = datetime.utcnow()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Generation variant {variant_id} failed: {e}")
+            GenerationVariant.query.filter_by(id=variant_id).update({
+                'status': 'failed', 'error': str(e), 'finished_at': datetime.utcnow()
+            })
+            db.session.commit()
+        finally:
+            db.session.remove()
+
+def resume_generation_jobs():
+    """Re-submit variants a restart left queued or running, so their jobs finish.
+
+    Whether the batch asked for a refresh is not stored, so resumed variants
+    may be served from the cache. Assumes a single process per database, as
+    with `python app.py`.
+    """
+    with app.app_context():
+        GenerationVariant.query.filter_by(status='running').update({'status': 'queued'})
+        db.session.commit()
+        pending = [variant_id for variant_id, in db.session.query(GenerationVariant.id).filter_by(
+            status='queued'
+        ).order_by(GenerationVariant.id)]
+    
+    for variant_id in pending:
+        generation_executor.submit(run_generation_variant, variant_id)
+    return pending
+
+def prune_ai_cache():
+    """Drop expired entries and the least recently used beyond the size limit"""
+    expired_before = datetime.utcnow() - timedelta(hours=app.config['AI_CACHE_TTL_HOURS'])
+    GeneratedContent.query.filter(GeneratedContent.created_at < expired_before).delete()
+    
+    keep = db.session.query(GeneratedContent.id).order_by(
+        GeneratedContent.last_used_at.desc()
+    ).limit(app.config['AI_CACHE_MAX_ENTRIES'])
+    GeneratedContent.query.filter(GeneratedContent.id.not_in(keep.scalar_subquery())).delete(synchronize_session=False)
+    db.session.commit()
+
+# Conditional Requests & Compression
+# Polled endpoints send a weak ETag with Cache-Control: no-cache, so
+# browsers revalidate each poll and get a bodiless 304 while nothing has changed.
+
+# The dashboard's recent campaigns, with the counters 'version' they were read at
+recent_campaigns_cache = (None, [])
+
+def read_stat_counters():
+    counters = dict(db.session.query(StatCounter.name, StatCounter.value).all())
+    if len(counters) < len(STAT_COUNTERS):
+        counters = rebuild_stats()
+    return counters
+
+def stats_etag(counters):
+    """Validator for anything derived from subscribers or campaigns (the counters' version covers both)"""
+    return 'stats-' + hashlib.sha1(json.dumps(counters, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def templates_etag():
+    """Validator for the template list.
+
+    The latest updated_at alone misses deletions, so the row count and the
+    highest id are part of it too. No Last-Modified is sent for the same reason.
+    """
+    count, max_id, last_modified = db.session.query(
+        db.func.count(NewsletterTemplate.id),
+        db.func.max(NewsletterTemplate.id),
+        db.func.max(NewsletterTemplate.updated_at)
+    ).one()
+    stamp = last_modified.isoformat() if last_modified else ''
+    return f'templates-{count}-{max_id}-{stamp}'
+
+def not_modified(etag):
+    """A 304 response if the request's ETag still matches, else None"""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return add_validators(Response(status=304), etag)
+
+def add_validators(response, etag):
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.after_request
+def compress_response(response):
+    if app.config['COMPRESS_ENABLED'] and compress.accepts_gzip(request):
+        compress.gzip_response(response, app.config['COMPRESS_MIN_SIZE'], app.config['COMPRESS_LEVEL'])
+    return response
+
 # Routes
 @app.route('/')
 def index():
@@ -136,30 +827,143 @@ def index():
 @app.route('/dashboard-stats')
 def dashboard_stats():
     """Get dashboard statistics"""
-    total_subscribers = Subscriber.query.filter_by(status='active').count()
-    total_campaigns = Campaign.query.count()
-    sent_campaigns = Campaign.query.filter_by(status='sent').count()
-    scheduled_campaigns = Campaign.query.filter_by(status='scheduled').count()
+    counters = read_stat_counters()
+    etag = stats_etag(counters)
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    recent_campaigns = Campaign.query.order_by(Campaign.created_at.desc()).limit(5).all()
+    # Recent campaigns only change when the version does
+    global recent_campaigns_cache
+    version, recent_campaigns = recent_campaigns_cache
+    if version != counters['version']:
+        recent = Campaign.query.order_by(Campaign.created_at.desc()).limit(5).all()
+        recent_campaigns = [c.to_dict() for c in recent]
+        recent_campaigns_cache = (counters['version'], recent_campaigns)
     
-    return jsonify({
-        'total_subscribers': total_subscribers,
-        'total_campaigns': total_campaigns,
-        'sent_campaigns': sent_campaigns,
-        'scheduled_campaigns': scheduled_campaigns,
-        'recent_campaigns': [c.to_dict() for c in recent_campaigns]
-    })
+    return add_validators(jsonify({
+        'total_subscribers': counters['active_subscribers'],
+        'total_campaigns': counters['total_campaigns'],
+        'sent_campaigns': counters['sent_campaigns'],
+        'scheduled_campaigns': counters['scheduled_campaigns'],
+        'recent_campaigns': recent_campaigns
+    }), etag)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint; send-job gauges are read at scrape time"""
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    
+    counts = dict(db.session.query(SendJob.status, db.func.count(SendJob.id)).group_by(SendJob.status).all())
+    for status in ('queued', 'running', 'completed', 'failed'):
+        send_jobs_gauge.set(counts.get(status, 0), status=status)
+    send_job_queue_gauge.set(send_job_queue.qsize())
+    send_job_rate_gauge.set(db.session.query(db.func.coalesce(db.func.sum(SendJob.rate), 0.0)).filter(
+        SendJob.status == 'running'
+    ).scalar())
+    
+    return Response(metrics_registry.render(), content_type=metrics.CONTENT_TYPE)
 
 # CRUD - Subscribers
 @app.route('/subscribers')
 def subscribers():
     return render_template('subscribers.html')
 
+# Streaming List Responses
+# List endpoints select plain columns (same keys as to_dict()) and encode
+# rows as they are read. `?fields=a,b` narrows the columns returned.
+SUBSCRIBER_LIST_COLUMNS = {
+    'id': Subscriber.id,
+    'name': Subscriber.name,
+    'email': Subscriber.email,
+    'program_interest': Subscriber.program_interest,
+    'status': Subscriber.status,
+    'created_at': Subscriber.created_at
+}
+TEMPLATE_LIST_COLUMNS = {
+    'id': NewsletterTemplate.id,
+    'title': NewsletterTemplate.title,
+    'subject': NewsletterTemplate.subject,
+    'content': NewsletterTemplate.content,
+    'created_at': NewsletterTemplate.created_at,
+    'updated_at': NewsletterTemplate.updated_at
+}
+CAMPAIGN_LIST_COLUMNS = {
+    'id': Campaign.id,
+    'name': Campaign.name,
+    'template_id': Campaign.template_id,
+    'status': Campaign.status,
+    'scheduled_date': Campaign.scheduled_date,
+    'sent_date': Campaign.sent_date,
+    'recipients_count': Campaign.recipients_count,
+    'opened_count': Campaign.opened_count,
+    'clicked_count': Campaign.clicked_count,
+    'segment_id': Campaign.segment_id,
+    'created_at': Campaign.created_at
+}
+LIST_YIELD_PER = 500  # rows fetched from the cursor at a time while streaming
+
+def list_columns(columns, required=('id',)):
+    """The {key: column} subset named by ?fields=, always keeping `required`"""
+    if not request.args.get('fields'):
+        return columns
+    wanted = set(request.args['fields'].split(',')) | set(required)
+    return {key: column for key, column in columns.items() if key in wanted}
+
+def stream_json(chunks):
+    return Response(stream_with_context(chunks), mimetype='application/json')
+
+def stream_list(columns, *order_by):
+    """Stream every row of the columns' table as a JSON array"""
+    rows = db.session.execute(
+        select(*columns.values()).order_by(*order_by).execution_options(yield_per=LIST_YIELD_PER)
+    )
+    return stream_json(RowSerializer(columns).iter_array(rows))
+
 @app.route('/api/subscribers', methods=['GET'])
 def get_subscribers():
-    subscribers = Subscriber.query.all()
-    return jsonify([s.to_dict() for s in subscribers])
+    """One page of subscribers in id order.
+
+    Query params: cursor (id of the last row already seen), limit, status,
+    program_interest, q (email prefix) and fields. Pass `next_cursor` from
+    the response as `cursor` to fetch the following page.
+    """
+    try:
+        cursor = int(request.args.get('cursor', 0))
+        limit = int(request.args.get('limit', app.config['SUBSCRIBERS_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'cursor and limit must be integers'}), 400
+    limit = min(max(limit, 1), app.config['SUBSCRIBERS_MAX_PAGE_SIZE'])
+    
+    etag = stats_etag(read_stat_counters())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    columns = list_columns(SUBSCRIBER_LIST_COLUMNS)
+    query = db.session.query(*columns.values()).filter(Subscriber.id > cursor)
+    if request.args.get('status'):
+        query = query.filter(Subscriber.status == request.args['status'])
+    if request.args.get('program_interest'):
+        query = query.filter(Subscriber.program_interest == request.args['program_interest'])
+    if request.args.get('q'):
+        # Range scan on the unique email index instead of a LIKE
+        prefix = request.args['q']
+        query = query.filter(Subscriber.email >= prefix, Subscriber.email < prefix + '\uffff')
+    
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(Subscriber.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = rows[-1].id if has_more else None
+    
+    def chunks():
+        yield '{"subscribers":'
+        yield from RowSerializer(columns).iter_array(rows)
+        yield f',"next_cursor":{json.dumps(next_cursor)}}}'
+    
+    return add_validators(stream_json(chunks()), etag)
 
 @app.route('/api/subscribers', methods=['POST'])
 def create_subscriber():
@@ -180,6 +984,23 @@ def create_subscriber():
     
     return jsonify(subscriber.to_dict()), 201
 
+@app.route('/api/subscribers/import', methods=['POST'])
+def import_subscribers_api():
+    """Bulk import from a CSV or NDJSON upload (multipart `file` or raw request body)"""
+    upload = request.files.get('file')
+    if upload:
+        fmt = request.args.get('format') or importer.detect_format(upload.filename, upload.mimetype)
+        stream = upload.stream
+    else:
+        fmt = request.args.get('format') or importer.detect_format(content_type=request.mimetype)
+        stream = request.stream
+    
+    if fmt not in importer.FORMATS:
+        return jsonify({'error': 'Unknown file format; use format=csv or format=ndjson'}), 400
+    
+    report = import_subscribers(importer.iter_records(importer.text_stream(stream), fmt))
+    return jsonify(report)
+
 @app.route('/api/subscribers/<int:id>', methods=['PUT'])
 def update_subscriber(id):
     subscriber = Subscriber.query.get_or_404(id)
@@ -196,10 +1017,110 @@ def update_subscriber(id):
 @app.route('/api/subscribers/<int:id>', methods=['DELETE'])
 def delete_subscriber(id):
     subscriber = Subscriber.query.get_or_404(id)
+    # Ledger rows reference the subscriber; server databases enforce the foreign key
+    Delivery.query.filter_by(subscriber_id=subscriber.id).delete()
     db.session.delete(subscriber)
     db.session.commit()
     return jsonify({'message': 'Subscriber deleted'})
 
+# Bulk Subscriber Import
+def import_subscribers(records, batch_size=None):
+    """Insert (row_number, record) pairs in batched transactions and return a report.
+
+    Each batch resolves duplicate emails with one IN query against the unique
+    email column, then inserts the remaining rows with a single executemany.
+    """
+    batch_size = batch_size or app.config['IMPORT_BATCH_SIZE']
+    max_errors = app.config['IMPORT_MAX_ERRORS']
+    report = {'rows': 0, 'imported': 0, 'duplicates': 0, 'invalid': 0, 'errors': [], 'errors_truncated': False}
+    started = time.monotonic()
+    
+    def error(row_number, email, message):
+        if len(report['errors']) < max_errors:
+            report['errors'].append({'row': row_number, 'email': email, 'error': message})
+        else:
+            report['errors_truncated'] = True
+    
+    def flush(batch):
+        emails = [values['email'] for _, values in batch]
+        existing = {email for (email,) in db.session.query(Subscriber.email).filter(Subscriber.email.in_(emails))}
+        
+        new_rows = []
+        for row_number, values in batch:
+            if values['email'] in existing:
+                report['duplicates'] += 1
+                error(row_number, values['email'], 'Email already exists')
+            else:
+                existing.add(values['email'])
+                new_rows.append((row_number, values))
+        if not new_rows:
+            return
+        
+        try:
+            db.session.execute(insert(Subscriber), [values for _, values in new_rows])
+            # Core inserts skip the ORM flush hook, so count them here
+            adjust_stats(db.session.connection(), {
+                'active_subscribers': sum(values['status'] == 'active' for _, values in new_rows)
+            })
+            db.session.commit()
+            report['imported'] += len(new_rows)
+        except IntegrityError:
+            # Lost a race with another writer; fall back to row-by-row for this batch
+            db.session.rollback()
+            for row_number, values in new_rows:
+                try:
+                    db.session.execute(insert(Subscriber), [values])
+                    adjust_stats(db.session.connection(), {'active_subscribers': int(values['status'] == 'active')})
+                    db.session.commit()
+                    report['imported'] += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    report['duplicates'] += 1
+                    error(row_number, values['email'], 'Email already exists')
+    
+    batch = []
+    for row_number, record in records:
+        report['rows'] += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            values = importer.clean_record(record)
+        except importer.RowError as e:
+            report['invalid'] += 1
+            error(row_number, record.get('email') if isinstance(record, dict) else None, str(e))
+            continue
+        
+        batch.append((row_number, values))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    
+    elapsed = time.monotonic() - started
+    report['elapsed_seconds'] = round(elapsed, 3)
+    report['rows_per_second'] = round(report['rows'] / elapsed, 1) if elapsed > 0 else 0.0
+    return report
+
+@app.cli.command('import-subscribers')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(importer.FORMATS), help='Defaults to the file extension')
+@click.option('--batch-size', type=int, default=None, help='Rows per transaction')
+def import_subscribers_command(path, fmt, batch_size):
+    """Bulk import subscribers from a CSV or NDJSON file"""
+    fmt = fmt or importer.detect_format(path)
+    if fmt is None:
+        raise click.UsageError('Cannot tell the file format from its name; pass --format')
+    
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        report = import_subscribers(importer.iter_records(stream, fmt), batch_size)
+    
+    for item in report['errors']:
+        print(f"Row {item['row']}: {item['error']} ({item['email']})")
+    print(f"✅ Imported {report['imported']} of {report['rows']} rows "
+          f"({report['duplicates']} duplicates, {report['invalid']} invalid) "
+          f"in {report['elapsed_seconds']}s — {report['rows_per_second']} rows/s")
+
 # CRUD - Templates
 @app.route('/templates')
 def templates():
@@ -207,8 +1128,12 @@ def templates():
 
 @app.route('/api/templates', methods=['GET'])
 def get_templates():
-    templates = NewsletterTemplate.query.all()
-    return jsonify([t.to_dict() for t in templates])
+    etag = templates_etag()
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    response = stream_list(list_columns(TEMPLATE_LIST_COLUMNS), NewsletterTemplate.id)
+    return add_validators(response, etag)
 
 @app.route('/api/templates', methods=['POST'])
 def create_template():
@@ -247,17 +1172,58 @@ def delete_template(id):
 # AI Content Generation
 @app.route('/api/generate-content', methods=['POST'])
 def generate_content():
-    data = request.json
-    topic = data.get('topic', 'Monthly Leadership Update')
+    data = request.json or {}
+    try:
+        topic = parse_topic(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     program_focus = data.get('program_focus')
+    if program_focus is not None and not isinstance(program_focus, str):
+        return jsonify({'error': 'program_focus must be a string'}), 400
+    refresh = str(data.get('refresh', '')).lower() in ('1', 'true', 'on', 'yes')
     
-    content = generate_newsletter_content(topic, program_focus)
+    content, cached = get_newsletter_content(topic, program_focus, refresh=refresh)
     
     if content:
-        return jsonify({'content': content})
+        return jsonify({'content': content, 'cached': cached})
     else:
         return jsonify({'error': 'Failed to generate content'}), 500
 
+@app.route('/api/generate-content/batch', methods=['POST'])
+def generate_content_batch():
+    """Queue one AI newsletter per program; poll /api/generation-jobs/<id> for results"""
+    data = request.json or {}
+    try:
+        topic = parse_topic(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    programs = data.get('programs', PROGRAMS)
+    refresh = str(data.get('refresh', '')).lower() in ('1', 'true', 'on', 'yes')
+    
+    if (not isinstance(programs, list) or not programs
+            or not all(isinstance(program, str) and program.strip() for program in programs)):
+        return jsonify({'error': 'programs must be a non-empty list of program names'}), 400
+    
+    job = GenerationJob(topic=topic)
+    job.variants = [
+        GenerationVariant(program_focus=program)
+        for program in dict.fromkeys(program.strip()[:100] for program in programs)
+    ]
+    db.session.add(job)
+    db.session.commit()
+    
+    for variant in job.variants:
+        generation_executor.submit(run_generation_variant, variant.id, refresh)
+    
+    response = jsonify({'job_id': job.id, 'job': job.to_dict()})
+    response.headers['Location'] = url_for('get_generation_job', id=job.id)
+    return response, 202
+
+@app.route('/api/generation-jobs/<int:id>', methods=['GET'])
+def get_generation_job(id):
+    job = GenerationJob.query.get_or_404(id)
+    return jsonify(job.to_dict())
+
 # CRUD - Campaigns
 @app.route('/campaigns')
 def campaigns():
@@ -265,8 +1231,11 @@ def campaigns():
 
 @app.route('/api/campaigns', methods=['GET'])
 def get_campaigns():
-    campaigns = Campaign.query.order_by(Campaign.created_at.desc()).all()
-    return jsonify([c.to_dict() for c in campaigns])
+    etag = stats_etag(read_stat_counters())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    return add_validators(stream_list(list_columns(CAMPAIGN_LIST_COLUMNS), Campaign.created_at.desc()), etag)
 
 @app.route('/api/campaigns', methods=['POST'])
 def create_campaign():
@@ -277,6 +1246,10 @@ def create_campaign():
         template_id=data['template_id'],
         status='draft'
     )
+    try:
+        campaign.segment_id = resolve_segment_id(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     db.session.add(campaign)
     db.session.commit()
     
@@ -290,86 +1263,672 @@ def update_campaign(id):
     campaign.name = data.get('name', campaign.name)
     campaign.template_id = data.get('template_id', campaign.template_id)
     campaign.status = data.get('status', campaign.status)
+    if 'segment_id' in data or 'segment' in data:
+        try:
+            campaign.segment_id = resolve_segment_id(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
     if data.get('scheduled_date'):
         campaign.scheduled_date = datetime.fromisoformat(data['scheduled_date'])
+    if campaign.status == 'scheduled' and campaign.scheduled_date is None:
+        db.session.rollback()
+        return jsonify({'error': 'A scheduled campaign needs a scheduled_date'}), 400
     
     db.session.commit()
+    if campaign.status == 'scheduled':
+        wake_campaign_scheduler()
     return jsonify(campaign.to_dict())
 
 @app.route('/api/campaigns/<int:id>', methods=['DELETE'])
 def delete_campaign(id):
     campaign = Campaign.query.get_or_404(id)
+    if SendJob.query.filter(SendJob.campaign_id == campaign.id, SendJob.status.in_(('queued', 'running'))).first():
+        return jsonify({'error': 'Campaign is being sent; wait for the send to finish'}), 409
+    Delivery.query.filter_by(campaign_id=campaign.id).delete()
     db.session.delete(campaign)
     db.session.commit()
     return jsonify({'message': 'Campaign deleted'})
 
+def resolve_segment_id(data):
+    """Segment for a campaign payload: `segment_id`, or an inline `segment` definition"""
+    if data.get('segment'):
+        segment = get_or_create_segment(parse_segment(data['segment']))
+    elif data.get('segment_id'):
+        segment = db.session.get(Segment, int(data['segment_id']))
+        if segment is None:
+            raise ValueError('Segment not found')
+    else:
+        return None
+    
+    if segment.status != 'active':
+        raise ValueError('Campaigns can only target active subscribers')
+    return segment.id
+
+# Segments
+@app.route('/api/segments', methods=['GET'])
+def get_segments():
+    segments = Segment.query.order_by(Segment.name).all()
+    return jsonify([s.to_dict() for s in segments])
+
+@app.route('/api/segments', methods=['POST'])
+def create_segment():
+    try:
+        segment = get_or_create_segment(parse_segment(request.json or {}))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    db.session.commit()
+    return jsonify(segment.to_dict()), 201
+
+@app.route('/api/segments/<int:id>/preview', methods=['GET'])
+def preview_segment(id):
+    segment = Segment.query.get_or_404(id)
+    return jsonify(segment_preview(segment.fields()))
+
+@app.route('/api/segments/preview', methods=['POST'])
+def preview_segment_definition():
+    """Audience size and a sample for an unsaved segment definition"""
+    try:
+        fields = parse_segment(request.json or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(segment_preview(fields))
+
+def segment_preview(fields):
+    sample = db.session.query(Subscriber.name, Subscriber.email).filter(
+        *segment_criteria(**fields)
+    ).order_by(Subscriber.id).limit(5).all()
+    return {
+        'count': count_segment(fields),
+        'sample': [{'name': name, 'email': email} for name, email in sample]
+    }
+
 @app.route('/api/campaigns/<int:id>/send', methods=['POST'])
 def send_campaign(id):
-    """Send newsletter campaign to all active subscribers"""
+    """Queue a background job that sends the campaign to all active subscribers"""
     campaign = Campaign.query.get_or_404(id)
-    template = NewsletterTemplate.query.get_or_404(campaign.template_id)
-    subscribers = Subscriber.query.filter_by(status='active').all()
+    NewsletterTemplate.query.get_or_404(campaign.template_id)
     
-    sent_count = 0
-    for subscriber in subscribers:
-        try:
-            # Personalize content
-            personalized_content = template.content.replace('{{name}}', subscriber.name)
+    job = SendJob.query.filter_by(campaign_id=campaign.id).order_by(SendJob.id.desc()).first()
+    if job and job.status in ('queued', 'running'):
+        return jsonify({'error': 'Campaign is already being sent', 'job': job.to_dict()}), 409
+    
+    job = queue_campaign_send(campaign, job)
+    return send_job_response(campaign, job)
+
+@app.route('/api/campaigns/<int:id>/retry', methods=['POST'])
+def retry_campaign(id):
+    """Re-send only to recipients whose delivery failed or never happened"""
+    campaign = Campaign.query.get_or_404(id)
+    NewsletterTemplate.query.get_or_404(campaign.template_id)
+    
+    job = SendJob.query.filter_by(campaign_id=campaign.id).order_by(SendJob.id.desc()).first()
+    if job and job.status in ('queued', 'running'):
+        return jsonify({'error': 'Campaign is already being sent', 'job': job.to_dict()}), 409
+    if not job:
+        return jsonify({'error': 'Campaign has not been sent yet'}), 400
+    
+    pending = db.session.query(db.func.count(Subscriber.id)).filter(*pending_audience(campaign)).scalar()
+    if not pending:
+        return jsonify({'message': 'Every recipient has already received this campaign', 'pending': 0})
+    
+    # Always a fresh job from the first subscriber: a failed job's checkpoint
+    # has already passed recipients whose delivery failed. The ledger skips
+    # everyone already sent.
+    job = queue_campaign_send(campaign)
+    return send_job_response(campaign, job)
+
+def send_job_response(campaign, job):
+    response = jsonify({
+        'message': f'Campaign queued for {job.total_count} subscribers',
+        'job_id': job.id,
+        'job': job.to_dict(),
+        'campaign': campaign.to_dict()
+    })
+    response.headers['Location'] = url_for('get_send_job', id=job.id)
+    return response, 202
+
+@app.route('/api/campaigns/<int:id>/deliveries', methods=['GET'])
+def get_deliveries(id):
+    """Ledger entries for a campaign in subscriber order, with per-status totals.
+
+    Query params: status (sent or failed), cursor (last subscriber_id seen), limit.
+    """
+    campaign = Campaign.query.get_or_404(id)
+    try:
+        cursor = int(request.args.get('cursor', 0))
+        limit = int(request.args.get('limit', app.config['SUBSCRIBERS_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({'error': 'cursor and limit must be integers'}), 400
+    limit = min(max(limit, 1), app.config['SUBSCRIBERS_MAX_PAGE_SIZE'])
+    
+    query = db.session.query(Delivery, Subscriber.email).outerjoin(
+        Subscriber, Subscriber.id == Delivery.subscriber_id
+    ).filter(Delivery.campaign_id == campaign.id, Delivery.subscriber_id > cursor)
+    if request.args.get('status'):
+        query = query.filter(Delivery.status == request.args['status'])
+    
+    rows = query.order_by(Delivery.subscriber_id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    counts = dict(db.session.query(Delivery.status, db.func.count(Delivery.id)).filter(
+        Delivery.campaign_id == campaign.id
+    ).group_by(Delivery.status).all())
+    
+    return jsonify({
+        'deliveries': [delivery.to_dict(email) for delivery, email in rows],
+        'next_cursor': rows[-1][0].subscriber_id if has_more else None,
+        'counts': {'sent': counts.get('sent', 0), 'failed': counts.get('failed', 0)}
+    })
+
+def queue_campaign_send(campaign, last_job=None):
+    """Create (or resume a failed) SendJob for the campaign and hand it to the runner"""
+    job = prepare_send_job(campaign, last_job)
+    db.session.commit()
+    enqueue_send_job(job.id)
+    return job
+
+def prepare_send_job(campaign, last_job=None):
+    """The SendJob for queue_campaign_send(), added to the session but not committed"""
+    if last_job and last_job.status == 'failed':
+        # Pick up after the last checkpoint instead of re-sending to everyone
+        job = last_job
+        job.status = 'queued'
+        job.error = None
+    else:
+        job = SendJob(
+            campaign_id=campaign.id,
+            status='queued',
+            total_count=db.session.query(db.func.count(Subscriber.id)).filter(*pending_audience(campaign)).scalar()
+        )
+        db.session.add(job)
+    
+    campaign.status = 'sending'
+    db.session.flush()
+    return job
+
+@app.route('/api/send-jobs/<int:id>', methods=['GET'])
+def get_send_job(id):
+    job = SendJob.query.get_or_404(id)
+    return jsonify(job.to_dict())
+
+def campaign_audience(campaign):
+    """Subscriber filters for a campaign: its segment, or every active subscriber"""
+    if campaign.segment is not None:
+        return campaign.segment.criteria()
+    return [Subscriber.status == 'active']
+
+def pending_audience(campaign):
+    """campaign_audience() minus subscribers the ledger shows as already sent"""
+    delivered = db.session.query(Delivery.id).filter(
+        Delivery.campaign_id == campaign.id,
+        Delivery.status == 'sent',
+        Delivery.subscriber_id == Subscriber.id
+    ).exists()
+    return campaign_audience(campaign) + [~delivered]
+
+def write_deliveries(campaign_id, results):
+    """Record a batch of (subscriber_id, error) send results in the ledger.
+
+    New recipients are bulk-inserted; recipients seen in an earlier run
+    (retries) are updated in one executemany.
+    """
+    if not results:
+        return
+    now = datetime.utcnow()
+    subscriber_ids = [subscriber_id for subscriber_id, _ in results]
+    existing = {subscriber_id for subscriber_id, in db.session.query(Delivery.subscriber_id).filter(
+        Delivery.campaign_id == campaign_id,
+        Delivery.subscriber_id.in_(subscriber_ids)
+    )}
+    
+    new_rows = []
+    updated_rows = []
+    for subscriber_id, error in results:
+        status = 'sent' if error is None else 'failed'
+        error = str(error)[:500] if error is not None else None
+        if subscriber_id in existing:
+            updated_rows.append({'b_subscriber_id': subscriber_id, 'b_status': status, 'b_error': error})
+        else:
+            new_rows.append({
+                'campaign_id': campaign_id,
+                'subscriber_id': subscriber_id,
+                'status': status,
+                'attempts': 1,
+                'error': error,
+                'created_at': now,
+                'updated_at': now
+            })
+    
+    if new_rows:
+        db.session.execute(insert(Delivery), new_rows)
+    if updated_rows:
+        db.session.connection().execute(
+            update(Delivery.__table__).where(
+                Delivery.__table__.c.campaign_id == campaign_id,
+                Delivery.__table__.c.subscriber_id == bindparam('b_subscriber_id')
+            ).values(
+                status=bindparam('b_status'),
+                error=bindparam('b_error'),
+                attempts=Delivery.__table__.c.attempts + 1,
+                updated_at=now
+            ),
+            updated_rows
+        )
+
+# Unsubscribe Links
+def unsubscribe_url(subscriber_id):
+    token = unsubscribe_serializer.dumps(subscriber_id)
+    return f"{app.config['APP_BASE_URL']}/unsubscribe/{token}"
+
+def unsubscribe_headers(url):
+    """List-Unsubscribe headers, including RFC 8058 one-click unsubscribe"""
+    return {
+        'List-Unsubscribe': f'<{url}>',
+        'List-Unsubscribe-Post': 'List-Unsubscribe=One-Click'
+    }
+
+UNSUBSCRIBE_CONFIRM_PAGE = """<h2>Unsubscribe from the Iron Lady newsletter?</h2>
+<form method="post"><button type="submit">Unsubscribe</button></form>"""
+
+@app.route('/unsubscribe/<token>', methods=['GET', 'POST'])
+def unsubscribe(token):
+    """GET asks for confirmation; only POST unsubscribes.
+
+    Link scanners and prefetchers in mail clients follow links with GET, so
+    they can no longer unsubscribe people. Mail clients' one-click requests
+    (RFC 8058) are POSTs to the same URL.
+    """
+    try:
+        subscriber_id = unsubscribe_serializer.loads(token)
+    except BadSignature:
+        return 'Invalid unsubscribe link', 404
+    
+    subscriber = Subscriber.query.get_or_404(subscriber_id)
+    if request.method == 'GET':
+        return UNSUBSCRIBE_CONFIRM_PAGE
+    
+    subscriber.status = 'unsubscribed'
+    db.session.commit()
+    return '<h2>You have been unsubscribed from the Iron Lady newsletter.</h2>'
+
+# Open & Click Tracking
+def flush_tracking(totals):
+    """Apply buffered hits: one UPDATE per campaign, one transaction per flush"""
+    with app.app_context():
+        for campaign_id, (opens, clicks) in totals.items():
+            db.session.execute(update(Campaign).where(Campaign.id == campaign_id).values(
+                opened_count=Campaign.opened_count + opens,
+                clicked_count=Campaign.clicked_count + clicks
+            ))
+        adjust_stats(db.session.connection(), {})
+        db.session.commit()
+
+tracking_counter = tracking.WriteBehindCounter(flush_tracking, interval=app.config['TRACKING_FLUSH_SECONDS'])
+atexit.register(tracking_counter.flush)
+
+def tracking_content(campaign_id, content):
+    """Rewrite a template's links and add the open pixel for one campaign"""
+    base_url = app.config['APP_BASE_URL']
+    pixel_url = f"{base_url}/t/o/{open_tracking_serializer.dumps(campaign_id)}.gif"
+    
+    def click_url(url):
+        return f"{base_url}/t/c/{click_tracking_serializer.dumps([campaign_id, url])}"
+    
+    return tracking.rewrite_links(content, click_url, pixel_url)
+
+def load_tracking_token(serializer, token):
+    """Token payload, or None if `serializer` did not sign it"""
+    try:
+        return serializer.loads(token)
+    except BadSignature:
+        return None
+
+@app.route('/t/o/<token>.gif')
+def track_open(token):
+    campaign_id = tracking.open_campaign_id(load_tracking_token(open_tracking_serializer, token))
+    if campaign_id is not None:
+        tracking_counter.record_open(campaign_id)
+    
+    response = Response(tracking.PIXEL_GIF, mimetype='image/gif')
+    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, private'
+    return response
+
+@app.route('/t/c/<token>')
+def track_click(token):
+    target = tracking.click_target(load_tracking_token(click_tracking_serializer, token))
+    if target is None:
+        return 'Invalid link', 404
+    
+    campaign_id, url = target
+    tracking_counter.record_click(campaign_id)
+    return redirect(url)
+
+# Background Send Jobs
+send_job_queue = queue.Queue()
+send_job_runner = None
+send_job_runner_lock = threading.Lock()
+SEND_JOB_CHECKPOINT_SECONDS = 1.0
+SEND_JOB_LEDGER_BATCH = 500  # commit early once this many results are buffered
+SEND_JOB_HEARTBEAT_SECONDS = 15
+SEND_JOB_STALE_SECONDS = 120  # a running job whose heartbeat is older has lost its process
+# Identifies this process as the owner of the jobs it claims
+send_job_owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+def start_send_job_runner():
+    """Start the background send worker"""
+    global send_job_runner
+    with send_job_runner_lock:
+        if send_job_runner and send_job_runner.is_alive():
+            return
+        send_job_runner = threading.Thread(target=send_job_worker, daemon=True)
+        send_job_runner.start()
+
+def recover_send_jobs():
+    """Re-queue running jobs whose owner stopped heartbeating, then queue every waiting job.
+
+    Only called on `python app.py` startup. Jobs another live process is
+    sending keep a fresh heartbeat and are left alone; claims are atomic,
+    so a queued job is still sent only once if several processes queue it.
+    """
+    with app.app_context():
+        stale_before = datetime.utcnow() - timedelta(seconds=SEND_JOB_STALE_SECONDS)
+        recovered = SendJob.query.filter(
+            SendJob.status == 'running',
+            db.or_(SendJob.heartbeat_at.is_(None), SendJob.heartbeat_at < stale_before)
+        ).update({'status': 'queued', 'owner': None}, synchronize_session=False)
+        db.session.commit()
+        pending = [job.id for job in SendJob.query.filter_by(status='queued').order_by(SendJob.id)]
+    
+    if recovered:
+        print(f"♻️  Re-queued {recovered} interrupted send job(s)")
+    for job_id in pending:
+        send_job_queue.put(job_id)
+    start_send_job_runner()
+
+def enqueue_send_job(job_id):
+    send_job_queue.put(job_id)
+    start_send_job_runner()
+
+def send_job_heartbeat(job_id, stop):
+    """Refresh a running job's heartbeat until `stop` is set"""
+    while not stop.wait(SEND_JOB_HEARTBEAT_SECONDS):
+        with app.app_context():
+            try:
+                SendJob.query.filter_by(id=job_id, status='running', owner=send_job_owner).update({
+                    'heartbeat_at': datetime.utcnow()
+                })
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Send job {job_id} heartbeat failed: {e}")
+            finally:
+                db.session.remove()
+
+def send_job_worker():
+    while True:
+        job_id = send_job_queue.get()
+        with app.app_context():
+            try:
+                run_send_job(job_id)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Send job {job_id} failed: {e}")
+                SendJob.query.filter_by(id=job_id).update({
+                    'status': 'failed',
+                    'error': str(e),
+                    'finished_at': datetime.utcnow()
+                })
+                db.session.commit()
+            finally:
+                db.session.remove()
+
+def run_send_job(job_id):
+    """Claim a queued job and send it, keeping its heartbeat fresh while it runs"""
+    claimed = SendJob.query.filter_by(id=job_id, status='queued').update({
+        'status': 'running',
+        'owner': send_job_owner,
+        'heartbeat_at': datetime.utcnow()
+    })
+    db.session.commit()
+    if not claimed:
+        return
+    
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=send_job_heartbeat, args=(job_id, stop), daemon=True)
+    heartbeat.start()
+    try:
+        send_claimed_job(job_id)
+    finally:
+        stop.set()
+
+def send_claimed_job(job_id):
+    """Send a campaign from the job's checkpoint, committing progress as it goes"""
+    job = db.session.get(SendJob, job_id)
+    campaign = job.campaign
+    template = db.session.get(NewsletterTemplate, campaign.template_id) if campaign else None
+    if template is None:
+        raise ValueError('Campaign or template no longer exists')
+    
+    content = template.content
+    if app.config['TRACKING_ENABLED']:
+        content = tracking_content(campaign.id, content)
+    compiled = template_cache.get(template.id, template.updated_at, template.subject, content, variant=campaign.id)
+    with_unsubscribe = 'unsubscribe_url' in compiled.fields
+    if job.started_at is None:
+        job.started_at = datetime.utcnow()
+    db.session.commit()
+    
+    campaign_id = campaign.id
+    # Skipping recipients already marked sent makes resumes and retries idempotent
+    subscribers = iter_subscribers(*pending_audience(campaign), after_id=job.last_subscriber_id)
+    
+    # Subscriber ids in submission order; the checkpoint only advances past
+    # ids whose result is known, so a crash never skips an unsent recipient.
+    in_flight = deque()
+    finished = set()
+    # sent/failed/results are not yet committed; processed counts this whole run
+    progress = {'sent': 0, 'failed': 0, 'processed': 0, 'checkpoint': job.last_subscriber_id, 'results': []}
+    run_started = time.monotonic()
+    last_commit = run_started
+    
+    def messages():
+        for subscriber in subscribers:
+            url = unsubscribe_url(subscriber.id) if with_unsubscribe else ''
+            subject, personalized_content = compiled.render(
+                name=subscriber.name,
+                email=subscriber.email,
+                program_interest=subscriber.program_interest,
+                unsubscribe_url=url
+            )
             
             msg = Message(
-                subject=template.subject,
+                subject=subject,
                 recipients=[subscriber.email],
-                html=personalized_content
+                html=personalized_content,
+                extra_headers=unsubscribe_headers(url) if url else None
             )
-            mail.send(msg)
-            sent_count += 1
-        except Exception as e:
-            print(f"Failed to send to {subscriber.email}: {e}")
+            in_flight.append(subscriber.id)
+            yield (subscriber.id, subscriber.email), msg
+    
+    def save_progress():
+        # Ledger rows and the checkpoint land in the same transaction
+        write_deliveries(campaign_id, progress['results'])
+        SendJob.query.filter_by(id=job_id).update({
+            'sent_count': SendJob.sent_count + progress['sent'],
+            'failed_count': SendJob.failed_count + progress['failed'],
+            'last_subscriber_id': progress['checkpoint'],
+            'rate': progress['processed'] / max(time.monotonic() - run_started, 1e-6),
+            'heartbeat_at': datetime.utcnow()
+        })
+        db.session.commit()
+        progress['sent'] = progress['failed'] = 0
+        progress['results'] = []
     
+    def on_result(key, error):
+        nonlocal last_commit
+        subscriber_id, email = key
+        progress['processed'] += 1
+        if error is None:
+            progress['sent'] += 1
+            messages_total.inc(result='sent')
+        else:
+            progress['failed'] += 1
+            messages_total.inc(result='failed')
+            print(f"Failed to send to {email}: {error}")
+        progress['results'].append((subscriber_id, error))
+        
+        finished.add(subscriber_id)
+        while in_flight and in_flight[0] in finished:
+            finished.discard(in_flight[0])
+            progress['checkpoint'] = in_flight.popleft()
+        
+        if (time.monotonic() - last_commit >= SEND_JOB_CHECKPOINT_SECONDS
+                or len(progress['results']) >= SEND_JOB_LEDGER_BATCH):
+            save_progress()
+            last_commit = time.monotonic()
+    
+    engine = DeliveryEngine(
+        app, mail,
+        workers=app.config['MAIL_SEND_WORKERS'],
+        pool_size=app.config['MAIL_POOL_SIZE'],
+        scheduler=send_scheduler,
+        max_retries=app.config['MAIL_MAX_RETRIES'],
+        on_attempt=record_smtp_attempt if app.config['METRICS_ENABLED'] else None
+    )
+    engine.send(messages(), on_result=on_result)
+    save_progress()
+    
+    job = db.session.get(SendJob, job_id)
+    job.status = 'completed'
+    job.finished_at = datetime.utcnow()
+    campaign = job.campaign
     campaign.status = 'sent'
-    campaign.sent_date = datetime.utcnow()
-    campaign.recipients_count = sent_count
+    campaign.sent_date = campaign.sent_date or job.finished_at
+    # Across every run, including retries
+    campaign.recipients_count = Delivery.query.filter_by(campaign_id=campaign.id, status='sent').count()
     db.session.commit()
-    
-    return jsonify({
-        'message': f'Campaign sent to {sent_count} subscribers',
-        'campaign': campaign.to_dict()
-    })
+    print(f"✅ Campaign {campaign.id} sent to {job.sent_count} subscribers ({job.failed_count} failed)")
+
+# Campaign Scheduler
+campaign_scheduler = None
+campaign_scheduler_lock = threading.Lock()
+campaign_scheduler_wake = threading.Event()
+# Upper bound on one sleep, so campaigns scheduled by another process are still noticed
+SCHEDULER_MAX_SLEEP_SECONDS = 3600
 
-# Automated Monthly Scheduling
-def schedule_monthly_newsletter():
-    """Schedule newsletter to be sent on the 1st of every month"""
-    def send_monthly():
-        # Get the latest active template or create default
-        template = NewsletterTemplate.query.order_by(NewsletterTemplate.updated_at.desc()).first()
+def start_campaign_scheduler():
+    """Start the thread that dispatches scheduled campaigns when they fall due"""
+    global campaign_scheduler
+    with campaign_scheduler_lock:
+        if campaign_scheduler and campaign_scheduler.is_alive():
+            return
+        campaign_scheduler = threading.Thread(target=campaign_scheduler_loop, daemon=True)
+        campaign_scheduler.start()
+
+def wake_campaign_scheduler():
+    """Make the scheduler re-read the next due time (after a campaign is (re)scheduled)"""
+    campaign_scheduler_wake.set()
+
+def campaign_scheduler_loop():
+    while True:
+        campaign_scheduler_wake.clear()
+        with app.app_context():
+            try:
+                if app.config['MONTHLY_NEWSLETTER_ENABLED']:
+                    ensure_monthly_campaign()
+                dispatch_due_campaigns()
+                next_due = next_scheduled_date()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Campaign scheduler error: {e}")
+                next_due = None
+            finally:
+                db.session.remove()
         
-        if template:
-            # Create and send campaign
-            campaign = Campaign(
-                name=f"Monthly Newsletter - {datetime.now().strftime('%B %Y')}",
-                template_id=template.id,
-                status='scheduled',
-                scheduled_date=datetime.now()
-            )
-            db.session.add(campaign)
-            db.session.commit()
-            
-            # Send the campaign
-            with app.app_context():
-                send_campaign(campaign.id)
+        timeout = SCHEDULER_MAX_SLEEP_SECONDS
+        if next_due is not None:
+            timeout = min(timeout, max((next_due - datetime.now()).total_seconds(), 0))
+        campaign_scheduler_wake.wait(timeout)
+
+def next_scheduled_date():
+    return db.session.query(db.func.min(Campaign.scheduled_date)).filter(
+        Campaign.status == 'scheduled',
+        Campaign.scheduled_date.isnot(None)
+    ).scalar()
+
+def dispatch_due_campaigns(now=None):
+    """Queue a send for every scheduled campaign whose time has come; returns their ids"""
+    now = now or datetime.now()
+    due = [campaign_id for campaign_id, in db.session.query(Campaign.id).filter(
+        Campaign.status == 'scheduled',
+        Campaign.scheduled_date <= now
+    ).order_by(Campaign.scheduled_date)]
+    
+    dispatched = []
+    for campaign_id in due:
+        # Only the process whose UPDATE flips the status gets to send it
+        claimed = db.session.execute(
+            update(Campaign)
+            .where(Campaign.id == campaign_id, Campaign.status == 'scheduled')
+            .values(status='sending')
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not claimed:
+            db.session.rollback()
+            continue
+        # Bulk UPDATEs bypass the after_flush counter hook
+        adjust_stats(db.session.connection(), {'scheduled_campaigns': -1})
+        
+        # The claim and its SendJob commit together, so a crash cannot leave
+        # a campaign 'sending' with no job to send it
+        campaign = db.session.get(Campaign, campaign_id, populate_existing=True)
+        job = prepare_send_job(campaign)
+        db.session.commit()
+        enqueue_send_job(job.id)
+        dispatched.append(campaign_id)
+        print(f"⏰ Scheduled campaign {campaign_id} dispatched")
+    return dispatched
+
+def ensure_monthly_campaign(now=None):
+    """Keep a campaign scheduled for 9:00 AM on the next 1st of the month, using the latest template"""
+    now = now or datetime.now()
+    first = now.replace(day=1, hour=9, minute=0, second=0, microsecond=0)
+    if first <= now:
+        first = (first + timedelta(days=32)).replace(day=1)
     
-    # Schedule for 1st of every month at 9:00 AM
-    schedule.every().month.at("09:00").do(send_monthly)
+    name = f"Monthly Newsletter - {first.strftime('%B %Y')}"
+    if Campaign.query.filter_by(name=name).first():
+        return None
     
-    while True:
-        schedule.run_pending()
-        time.sleep(3600)  # Check every hour
+    template = NewsletterTemplate.query.order_by(NewsletterTemplate.updated_at.desc()).first()
+    if template is None:
+        return None
+    
+    campaign = Campaign(name=name, template_id=template.id, status='scheduled', scheduled_date=first)
+    db.session.add(campaign)
+    db.session.commit()
+    return campaign
+
+# Schema Migrations
+# Numbered migrations with their own frozen DDL live in migrations.py
+def migrate_db():
+    """Bring the database schema up to date; returns the versions applied"""
+    with app.app_context():
+        return storage.run_migrations(db.engine, migrations.MIGRATIONS)
+
+@app.cli.command('migrate-db')
+def migrate_db_command():
+    """Apply pending schema migrations"""
+    applied = migrate_db()
+    print(f"✅ Schema up to date (applied: {', '.join(map(str, applied)) or 'none'})")
 
 # Initialize Database
 def init_db():
+    migrate_db()
     with app.app_context():
-        db.create_all()
+        rebuild_stats()
         
         # Add sample data if empty
         if Subscriber.query.count() == 0:
@@ -385,9 +1944,13 @@ def init_db():
 if __name__ == '__main__':
     init_db()
     
-    # Start scheduler in background thread
-    # scheduler_thread = threading.Thread(target=schedule_monthly_newsletter, daemon=True)
-    # scheduler_thread.start()
+    debug = True
+    # The reloader runs this block in a watcher process and again in the
+    # serving child (WERKZEUG_RUN_MAIN=true); only one may own the runners
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        recover_send_jobs()
+        start_campaign_scheduler()
+        resume_generation_jobs()
     
     print("\n" + "="*80)
     print("🎉 Iron Lady Newsletter System Starting...")
@@ -398,4 +1961,4 @@ if __name__ == '__main__':
     print("📨 Campaigns: http://localhost:5000/campaigns")
     print("\n" + "="*80 + "\n")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=debug, host='0.0.0.0', port=5000)
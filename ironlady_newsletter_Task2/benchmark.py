@@ -0,0 +1,350 @@
+"""
+Iron Lady Newsletter System - Benchmark Suite
+Seeds a throwaway database with synthetic subscribers, templates and
+campaigns, sends a campaign through the local SMTP sink, and times the
+list endpoints and dashboard stats. Results are written as JSON so runs
+can be compared.
+
+Usage:
+    python benchmark.py --size 10k
+    python benchmark.py --size 100k --output results-100k.json
+    python benchmark.py --size 10k --baseline results-before.json
+
+Sizes: 10k, 100k, 1m (override with --subscribers, --templates,
+--campaigns, --send). The database is created in a temporary directory
+unless --database is given.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy.engine import make_url
+
+from smtp_sink import SMTPSink
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SIZES = {
+    '10k': {'subscribers': 10000, 'templates': 50, 'campaigns': 500, 'send': 2000},
+    '100k': {'subscribers': 100000, 'templates': 200, 'campaigns': 2000, 'send': 5000},
+    '1m': {'subscribers': 1000000, 'templates': 500, 'campaigns': 10000, 'send': 10000},
+}
+
+SEED_BATCH = 10000
+SEND_PROGRAM = 'Benchmark Send'  # program_interest of the subscribers the send phase targets
+
+TEMPLATE_BODY = """<html><body>
+<h1>Hello {{name}}</h1>
+<p>News for members interested in {{program_interest}}.</p>
+%s
+<p><a href="https://iamironlady.com/programs">Explore programs</a></p>
+<p><a href="{{unsubscribe_url}}">Unsubscribe</a></p>
+</body></html>"""
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(samples):
+    return {
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+        'p50_ms': round(percentile(samples, 0.5) * 1000, 3),
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+    }
+
+
+def max_rss_mb():
+    """Peak resident memory of this process, or None where it cannot be read"""
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class Phase(object):
+    """Times a block and, with trace=True, records its peak Python allocation.
+
+    Tracing slows every allocation down, so timed-throughput phases run
+    without it and rely on max RSS instead.
+    """
+
+    def __init__(self, results, name, trace=True):
+        self.results = results
+        self.name = name
+        self.trace = trace
+
+    def __enter__(self):
+        if self.trace:
+            tracemalloc.start()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        elapsed = time.perf_counter() - self.started
+        entry = self.results.setdefault(self.name, {})
+        entry['seconds'] = round(elapsed, 3)
+        if self.trace:
+            entry['peak_alloc_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            tracemalloc.stop()
+        print(f"   {self.name}: {elapsed:.2f}s" + (f", peak {entry['peak_alloc_mb']} MB" if self.trace else ''))
+
+
+def seed(A, sizes, results):
+    """Bulk-insert synthetic rows, bypassing the ORM like the importer does"""
+    now = datetime.utcnow()
+    programs = A.PROGRAMS
+
+    with Phase(results, 'seed_subscribers', trace=False):
+        total = sizes['subscribers']
+        for start in range(0, total, SEED_BATCH):
+            rows = []
+            for i in range(start, min(start + SEED_BATCH, total)):
+                rows.append({
+                    'name': f'Member {i}',
+                    'email': f'member{i}@bench.example.com',
+                    'program_interest': SEND_PROGRAM if i < sizes['send'] else programs[i % len(programs)],
+                    'status': 'unsubscribed' if i % 20 == 19 else 'active',
+                    'created_at': now - timedelta(minutes=total - i)
+                })
+            A.db.session.execute(A.insert(A.Subscriber), rows)
+            A.db.session.commit()
+    results['seed_subscribers']['rows_per_second'] = round(total / results['seed_subscribers']['seconds'], 1)
+
+    with Phase(results, 'seed_templates_campaigns'):
+        filler = '\n'.join(f'<p>Paragraph {n}: leadership, growth and community.</p>' for n in range(60))
+        A.db.session.execute(A.insert(A.NewsletterTemplate), [{
+            'title': f'Template {i}',
+            'subject': f'Iron Lady update {i} for {{{{name}}}}',
+            'content': TEMPLATE_BODY % filler,
+            'created_at': now,
+            'updated_at': now
+        } for i in range(sizes['templates'])])
+
+        campaigns = []
+        for i in range(sizes['campaigns']):
+            status = ('sent', 'sent', 'sent', 'sent', 'sent', 'sent', 'sent', 'scheduled', 'draft', 'draft')[i % 10]
+            campaigns.append({
+                'name': f'Campaign {i}',
+                'template_id': i % sizes['templates'] + 1,
+                'status': status,
+                'scheduled_date': now + timedelta(days=30) if status == 'scheduled' else None,
+                'sent_date': now - timedelta(hours=i) if status == 'sent' else None,
+                'recipients_count': sizes['subscribers'] if status == 'sent' else 0,
+                'opened_count': 0,
+                'clicked_count': 0,
+                'created_at': now - timedelta(hours=sizes['campaigns'] - i)
+            })
+        A.db.session.execute(A.insert(A.Campaign), campaigns)
+        A.db.session.commit()
+        A.rebuild_stats()
+
+
+def time_endpoint(client, url, repeat):
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        size = len(response.get_data())
+        samples.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url} returned {response.status_code}')
+    result = summarize(samples)
+    result['first_ms'] = round(samples[0] * 1000, 3)
+    result['bytes'] = size
+    return result
+
+
+def measure_endpoints(client, sizes, repeat, results):
+    deep_cursor = max(sizes['subscribers'] - 100, 0)
+    endpoints = {
+        'dashboard_stats': '/dashboard-stats',
+        'subscribers_first_page': '/api/subscribers',
+        'subscribers_deep_page': f'/api/subscribers?cursor={deep_cursor}',
+        'subscribers_filtered': '/api/subscribers?status=active&program_interest=MBW&limit=100',
+        'subscribers_email_prefix': '/api/subscribers?q=member9',
+        'templates': '/api/templates',
+        'templates_titles': '/api/templates?fields=id,title',
+        'campaigns': '/api/campaigns',
+    }
+    latency = results.setdefault('endpoints', {})
+    for name, url in endpoints.items():
+        latency[name] = time_endpoint(client, url, repeat)
+        # One extra, traced request for the allocation peak
+        tracemalloc.start()
+        client.get(url).get_data()
+        latency[name]['peak_alloc_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+        print(f"   {name}: p50 {latency[name]['p50_ms']}ms, p95 {latency[name]['p95_ms']}ms, "
+              f"{latency[name]['bytes']} bytes")
+
+
+def measure_send(A, client, sink, sizes, results):
+    with A.app.app_context():
+        segment = A.get_or_create_segment(A.parse_segment({'program_interest': SEND_PROGRAM}))
+        campaign = A.Campaign(name='Benchmark send', template_id=1, segment_id=segment.id)
+        A.db.session.add(campaign)
+        A.db.session.commit()
+        campaign_id = campaign.id
+
+    with Phase(results, 'send', trace=False):
+        response = client.post(f'/api/campaigns/{campaign_id}/send')
+        if response.status_code != 202:
+            raise RuntimeError(f'send returned {response.status_code}: {response.get_json()}')
+        location = response.headers['Location']
+        while True:
+            job = client.get(location).get_json()
+            if job['status'] in ('completed', 'failed'):
+                break
+            time.sleep(0.05)
+
+    send = results['send']
+    send.update({
+        'status': job['status'],
+        'sent': job['sent'],
+        'failed': job['failed'],
+        'received_by_sink': sink.messages,
+        'bytes_received': sink.bytes,
+        'messages_per_second': round(job['sent'] / send['seconds'], 1) if send['seconds'] else None,
+        'workers': A.app.config['MAIL_SEND_WORKERS'],
+    })
+    print(f"   send: {job['sent']} sent, {job['failed']} failed, {send['messages_per_second']} msg/s")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results, prefix=''):
+    """{'a': {'b': 1}} -> {'a.b': 1}, numeric leaves only"""
+    flat = {}
+    for key, value in results.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline, current):
+    """Print every metric that moved by more than 10% against a baseline run"""
+    before = flatten(baseline['results'])
+    after = flatten(current['results'])
+    print(f"\n📊 Compared with {baseline['meta'].get('revision')} ({baseline['meta'].get('started_at')}):")
+    changed = False
+    for name in sorted(set(before) & set(after)):
+        if before[name] and abs(after[name] - before[name]) / abs(before[name]) > 0.10:
+            change = (after[name] - before[name]) / abs(before[name]) * 100
+            print(f"   {name}: {before[name]} -> {after[name]} ({change:+.0f}%)")
+            changed = True
+    if not changed:
+        print("   no metric moved by more than 10%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the newsletter app with synthetic data')
+    parser.add_argument('--size', choices=sorted(SIZES), default='10k')
+    parser.add_argument('--subscribers', type=int)
+    parser.add_argument('--templates', type=int)
+    parser.add_argument('--campaigns', type=int)
+    parser.add_argument('--send', type=int, help='recipients in the timed send')
+    parser.add_argument('--repeat', type=int, default=20, help='requests per endpoint')
+    parser.add_argument('--database', help='SQLALCHEMY_DATABASE_URI to use instead of a temporary SQLite file')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    sizes = dict(SIZES[args.size])
+    for key in ('subscribers', 'templates', 'campaigns', 'send'):
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+    sizes['send'] = min(sizes['send'], sizes['subscribers'])
+    sizes['templates'] = max(sizes['templates'], 1)
+
+    workdir = None
+    if args.database:
+        database_uri = args.database
+    else:
+        workdir = tempfile.mkdtemp(prefix='newsletter-bench-')
+        database_uri = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+
+    sink = SMTPSink(port=0).start()
+    host, port = sink.address
+    # The app reads its configuration at import time
+    os.environ.update({
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'MAIL_SERVER': host,
+        'MAIL_PORT': str(port),
+        'MAIL_USE_TLS': 'false',
+        'MAIL_RATE_PER_SECOND': '0',
+        'MAIL_RATE_PER_MINUTE': '0',
+        'MAIL_RATE_PER_DAY': '0',
+    })
+    import app as A
+
+    report = {
+        'meta': {
+            'started_at': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': make_url(database_uri).get_backend_name(),
+            'sizes': sizes,
+        },
+        'results': {}
+    }
+    results = report['results']
+
+    print(f"🏁 Benchmarking with {sizes}")
+    try:
+        A.migrate_db()
+        with A.app.app_context():
+            seed(A, sizes, results)
+
+        client = A.app.test_client()
+        measure_endpoints(client, sizes, args.repeat, results)
+        measure_send(A, client, sink, sizes, results)
+        rss = max_rss_mb()
+        if rss is not None:
+            results['max_rss_mb'] = rss
+    finally:
+        sink.stop()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    rss = f" (max RSS {results['max_rss_mb']} MB)" if 'max_rss_mb' in results else ''
+    print(f"✅ Results written to {args.output}{rss}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
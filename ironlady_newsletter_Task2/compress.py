@@ -0,0 +1,61 @@
+"""
+Iron Lady Newsletter System - Response Compression
+Gzip for text and JSON responses, including streamed ones, which are
+compressed chunk by chunk as they are produced.
+"""
+
+import gzip
+import zlib
+
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'application/json',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'application/javascript',
+))
+
+
+def accepts_gzip(request):
+    return request.accept_encodings['gzip'] > 0
+
+
+def gzip_response(response, min_size=1024, level=6):
+    """Gzip `response` in place when it is worth it; returns the response.
+
+    Buffered bodies smaller than `min_size` bytes are left alone. Streamed
+    bodies have no known size, so they are always compressed.
+    """
+    if (response.status_code < 200 or response.status_code >= 300 or response.status_code == 204
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if response.is_streamed:
+        response.response = _gzip_stream(response.response, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(gzip.compress(data, level))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def _gzip_stream(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        # Let the wrapped generator (and its request context) finish up
+        close = getattr(chunks, 'close', None)
+        if close:
+            close()
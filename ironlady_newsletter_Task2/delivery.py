@@ -0,0 +1,233 @@
+"""
+Iron Lady Newsletter System - SMTP Delivery Engine
+Sends campaign emails over a bounded pool of long-lived SMTP connections,
+spreading recipients across worker threads, optionally paced by a
+ratelimit.SendScheduler.
+"""
+
+import queue
+import random
+import smtplib
+import threading
+import time
+
+_STOP = object()
+
+
+def is_connection_error(error):
+    """True when the SMTP connection itself is unusable after this error"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    # smtplib.SMTPException subclasses OSError; only raw socket errors break the connection
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def smtp_code(error):
+    """The SMTP reply code carried by an error, if any"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return max(codes) if codes else None
+    return getattr(error, 'smtp_code', None)
+
+
+def is_throttling_error(error):
+    """True for transient 4xx replies (rate limits, 'try again later')"""
+    code = smtp_code(error)
+    return code is not None and 400 <= code < 500
+
+
+class SMTPConnectionPool(object):
+    """Bounded pool of open Flask-Mail connections (see Mail.connect())"""
+
+    def __init__(self, mail, size=4):
+        self.mail = mail
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        """Borrow an open connection, opening a new one if none are idle"""
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._open()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, broken=False):
+        """Return a connection to the pool, or close it if it is broken"""
+        if broken:
+            self._close(conn)
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(conn)
+
+    def _open(self):
+        conn = self.mail.connect()
+        conn.__enter__()
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.__exit__(None, None, None)
+        except Exception:
+            pass
+
+
+class DeliveryReport(object):
+    """Counters and throughput for a single engine run"""
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def rate(self):
+        """Messages per second"""
+        elapsed = self.elapsed
+        return (self.sent + self.failed) / elapsed if elapsed > 0 else 0.0
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+    def to_dict(self):
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'messages_per_second': round(self.rate, 2)
+        }
+
+
+class DeliveryEngine(object):
+    """Sends (key, Message) pairs concurrently over pooled SMTP connections"""
+
+    def __init__(self, app, mail, workers=4, pool_size=None, scheduler=None, max_retries=5, on_attempt=None):
+        self.app = app
+        self.mail = mail
+        self.workers = max(1, workers)
+        self.pool_size = pool_size or self.workers
+        self.scheduler = scheduler  # ratelimit.SendScheduler, or None for no limits
+        self.max_retries = max_retries
+        # Called from worker threads as on_attempt(seconds, error) after every SMTP send
+        self.on_attempt = on_attempt
+
+    def send(self, messages, on_result=None):
+        """Deliver every message and return a DeliveryReport.
+
+        `messages` is any iterable of (key, Message) pairs; it is consumed
+        lazily so callers can stream recipients. `on_result(key, error)` is
+        called in the calling thread for every message, with error=None on
+        success.
+        """
+        pool = SMTPConnectionPool(self.mail, self.pool_size)
+        tasks = queue.Queue(maxsize=self.workers * 4)
+        results = queue.Queue()
+        report = DeliveryReport()
+
+        threads = [
+            threading.Thread(target=self._worker, args=(pool, tasks, results), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for item in messages:
+                tasks.put(item)
+                self._drain(results, report, on_result)
+        finally:
+            for _ in threads:
+                tasks.put(_STOP)
+            for thread in threads:
+                thread.join()
+            pool.close()
+
+        self._drain(results, report, on_result)
+        report.finish()
+        return report
+
+    def _drain(self, results, report, on_result):
+        while True:
+            try:
+                key, error = results.get_nowait()
+            except queue.Empty:
+                return
+            if error is None:
+                report.sent += 1
+            else:
+                report.failed += 1
+            if on_result:
+                on_result(key, error)
+
+    def _worker(self, pool, tasks, results):
+        with self.app.app_context():
+            while True:
+                item = tasks.get()
+                if item is _STOP:
+                    return
+                key, msg = item
+                results.put((key, self._deliver(pool, msg)))
+
+    def _deliver(self, pool, msg):
+        """Send one message, retrying throttled attempts with jittered backoff"""
+        for attempt in range(self.max_retries + 1):
+            if self.scheduler:
+                self.scheduler.acquire()
+            error = self._attempt(pool, msg)
+            if error is None:
+                if self.scheduler:
+                    self.scheduler.succeeded()
+                return None
+            if not is_throttling_error(error) or attempt == self.max_retries:
+                return error
+            if self.scheduler:
+                delay = self.scheduler.throttled(attempt)
+            else:
+                delay = random.uniform(0, min(60.0, 2 ** attempt))
+            time.sleep(delay)
+        return error
+
+    def _attempt(self, pool, msg):
+        """Send over a pooled connection, reconnecting once if it went stale"""
+        for attempt in range(2):
+            try:
+                conn = pool.acquire()
+            except Exception as e:
+                return e
+            started = time.perf_counter()
+            try:
+                conn.send(msg)
+            except Exception as e:
+                if self.on_attempt:
+                    self.on_attempt(time.perf_counter() - started, e)
+                broken = is_connection_error(e)
+                # A 421 reply means the server is closing this connection
+                broken = broken or smtp_code(e) == 421
+                pool.release(conn, broken=broken)
+                if broken and attempt == 0 and not is_throttling_error(e):
+                    continue
+                return e
+            if self.on_attempt:
+                self.on_attempt(time.perf_counter() - started, None)
+            pool.release(conn)
+            return None
@@ -0,0 +1,85 @@
+"""
+Iron Lady Newsletter System - Subscriber Import Parsing
+Streams subscriber records out of CSV or NDJSON files one row at a time,
+so imports never hold the whole file in memory.
+"""
+
+import csv
+import io
+import json
+
+FORMATS = ('csv', 'ndjson')
+STATUSES = ('active', 'unsubscribed')
+
+
+class RowError(ValueError):
+    """A single row that cannot be imported"""
+
+
+def detect_format(filename=None, content_type=None):
+    """Guess 'csv' or 'ndjson' from a filename or content type"""
+    name = (filename or '').lower()
+    content_type = (content_type or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    if name.endswith('.csv') or 'csv' in content_type:
+        return 'csv'
+    return None
+
+
+def text_stream(binary):
+    """Wrap a binary upload stream for line-by-line decoding"""
+    return io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+
+
+def iter_records(stream, fmt):
+    """Yield (row_number, record dict or RowError) from a text stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        # Row 1 is the header line
+        for row_number, row in enumerate(reader, start=2):
+            yield row_number, row
+    elif fmt == 'ndjson':
+        for row_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row_number, RowError(f'Invalid JSON: {e}')
+                continue
+            if not isinstance(record, dict):
+                yield row_number, RowError('Each line must be a JSON object')
+                continue
+            yield row_number, record
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
+
+
+def _text(value):
+    return str(value).strip() if value is not None else ''
+
+
+def clean_record(record):
+    """Validate one raw record and return the subscriber column values"""
+    name = _text(record.get('name'))
+    email = _text(record.get('email'))
+    program_interest = _text(record.get('program_interest'))
+    status = _text(record.get('status')).lower() or 'active'
+
+    if not name:
+        raise RowError('Missing name')
+    if not email or '@' not in email:
+        raise RowError('Invalid email')
+    if len(name) > 100 or len(email) > 120 or len(program_interest) > 100:
+        raise RowError('Value too long')
+    if status not in STATUSES:
+        raise RowError(f'Invalid status: {status}')
+
+    return {
+        'name': name,
+        'email': email,
+        'program_interest': program_interest,
+        'status': status
+    }
@@ -0,0 +1,184 @@
+"""
+Iron Lady Newsletter System - Schema Migrations
+Numbered, forward-only migrations applied by storage.run_migrations().
+Each one carries its own frozen DDL instead of reading the current models,
+so a fresh database is built step by step exactly as an old one was
+upgraded. Append new migrations; never edit one that has been applied.
+"""
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    UniqueConstraint, inspect, text,
+)
+
+# Migration 1: the schema as it stood when migrations were introduced
+baseline_metadata = MetaData()
+
+Table(
+    'subscriber', baseline_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('email', String(120), unique=True, nullable=False),
+    Column('program_interest', String(100)),
+    Column('status', String(20)),
+    Column('created_at', DateTime),
+)
+
+Table(
+    'newsletter_template', baseline_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('title', String(200), nullable=False),
+    Column('subject', String(200), nullable=False),
+    Column('content', Text, nullable=False),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+)
+
+Table(
+    'segment', baseline_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(200), nullable=False),
+    Column('program_interest', String(100)),
+    Column('status', String(20)),
+    Column('signed_up_after', DateTime),
+    Column('signed_up_before', DateTime),
+    Column('created_at', DateTime),
+)
+
+Table(
+    'campaign', baseline_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(200), nullable=False),
+    Column('template_id', Integer, ForeignKey('newsletter_template.id')),
+    Column('status', String(20)),
+    Column('scheduled_date', DateTime),
+    Column('sent_date', DateTime),
+    Column('recipients_count', Integer),
+    Column('opened_count', Integer),
+    Column('clicked_count', Integer),
+    Column('created_at', DateTime),
+    Column('segment_id', Integer, ForeignKey('segment.id')),
+)
+
+Table(
+    'send_job', baseline_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('campaign_id', Integer, ForeignKey('campaign.id'), nullable=False),
+    Column('status', String(20)),
+    Column('total_count', Integer),
+    Column('sent_count', Integer),
+    Column('failed_count', Integer),
+    Column('last_subscriber_id', Integer),
+    Column('rate', Float),
+    Column('error', Text),
+    Column('created_at', DateTime),
+    Column('started_at', DateTime),
+    Column('finished_at', DateTime),
+)
+
+Table(
+    'delivery', baseline_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('campaign_id', Integer, ForeignKey('campaign.id'), nullable=False),
+    Column('subscriber_id', Integer, ForeignKey('subscriber.id'), nullable=False),
+    Column('status', String(20), nullable=False),
+    Column('attempts', Integer),
+    Column('error', Text),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+    UniqueConstraint('campaign_id', 'subscriber_id', name='uq_delivery_campaign_subscriber'),
+)
+
+Table(
+    'stat_counter', baseline_metadata,
+    Column('name', String(50), primary_key=True),
+    Column('value', Integer, nullable=False),
+)
+
+Table(
+    'generated_content', baseline_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('cache_key', String(64), unique=True, nullable=False),
+    Column('topic', String(200)),
+    Column('program_focus', String(100)),
+    Column('prompt_version', Integer),
+    Column('content', Text, nullable=False),
+    Column('created_at', DateTime),
+    Column('last_used_at', DateTime),
+)
+
+Table(
+    'generation_job', baseline_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('topic', String(200), nullable=False),
+    Column('created_at', DateTime),
+)
+
+Table(
+    'generation_variant', baseline_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('job_id', Integer, ForeignKey('generation_job.id'), nullable=False),
+    Column('program_focus', String(100)),
+    Column('status', String(20)),
+    Column('template_id', Integer, ForeignKey('newsletter_template.id')),
+    Column('cached', Boolean),
+    Column('error', Text),
+    Column('finished_at', DateTime),
+)
+
+
+def add_missing_columns(connection, metadata):
+    """ALTER in columns of `metadata`'s tables that an existing table lacks"""
+    inspector = inspect(connection)
+    for table in metadata.sorted_tables:
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(connection.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+
+# Migration 3: send jobs record the process running them
+send_job_owner_metadata = MetaData()
+
+Table(
+    'send_job', send_job_owner_metadata,
+    Column('owner', String(100)),
+    Column('heartbeat_at', DateTime),
+)
+
+
+def baseline(connection):
+    baseline_metadata.create_all(connection, checkfirst=True)
+    # Databases created before migrations existed may predate some columns
+    add_missing_columns(connection, baseline_metadata)
+
+
+def create_indexes(*indexes):
+    """Migration creating each (name, table, columns) index that does not exist yet"""
+    def migrate(connection):
+        # Reflected, so the index is built on the table as it is now
+        metadata = MetaData()
+        for name, table_name, columns in indexes:
+            table = Table(table_name, metadata, autoload_with=connection)
+            Index(name, *(table.c[column] for column in columns)).create(connection, checkfirst=True)
+    return migrate
+
+
+MIGRATIONS = [
+    (1, 'baseline schema', baseline),
+    (2, 'indexes for hot queries', create_indexes(
+        ('ix_subscriber_status_id', 'subscriber', ('status', 'id')),
+        ('ix_subscriber_program_interest_id', 'subscriber', ('program_interest', 'id')),
+        ('ix_subscriber_program_interest_status_id', 'subscriber', ('program_interest', 'status', 'id')),
+        ('ix_subscriber_status_created_at', 'subscriber', ('status', 'created_at')),
+        ('ix_campaign_created_at', 'campaign', ('created_at',)),
+        ('ix_campaign_status_scheduled_date', 'campaign', ('status', 'scheduled_date')),
+        ('ix_send_job_campaign_id_id', 'send_job', ('campaign_id', 'id')),
+        ('ix_send_job_status', 'send_job', ('status',)),
+        ('ix_delivery_campaign_status_subscriber', 'delivery', ('campaign_id', 'status', 'subscriber_id')),
+        ('ix_generated_content_last_used_at', 'generated_content', ('last_used_at',)),
+        ('ix_generation_variant_job_id', 'generation_variant', ('job_id',)),
+    )),
+    (3, 'send job owner and heartbeat', lambda connection: add_missing_columns(connection, send_job_owner_metadata)),
+]
@@ -0,0 +1,101 @@
+"""
+Iron Lady Newsletter System - Personalization Engine
+Compiles a newsletter template once into literal segments and placeholder
+slots, so rendering per recipient is a single join.
+
+Supported placeholders: {{name}}, {{email}}, {{program_interest}},
+{{unsubscribe_url}}. Whitespace inside the braces is allowed; unknown
+placeholders are left in the output untouched.
+"""
+
+import html
+import re
+import threading
+from collections import OrderedDict
+
+FIELDS = ('name', 'email', 'program_interest', 'unsubscribe_url')
+
+PLACEHOLDER_RE = re.compile(r'\{\{\s*(' + '|'.join(FIELDS) + r')\s*\}\}')
+
+
+class CompiledTemplate(object):
+    """A template split into literal parts with placeholder slots between them"""
+
+    __slots__ = ('parts', 'slots', 'fields')
+
+    def __init__(self, source):
+        self.parts = []
+        self.slots = []  # (index into parts, field name)
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            self.parts.append(source[position:match.start()])
+            self.slots.append((len(self.parts), match.group(1)))
+            self.parts.append('')
+            position = match.end()
+        self.parts.append(source[position:])
+        self.fields = frozenset(field for _, field in self.slots)
+
+    def render(self, values):
+        """Fill the slots from `values` (field name -> string)"""
+        if not self.slots:
+            return self.parts[0]
+        parts = self.parts[:]
+        for index, field in self.slots:
+            parts[index] = values.get(field, '')
+        return ''.join(parts)
+
+
+class CompiledNewsletter(object):
+    """Compiled subject and HTML body of one NewsletterTemplate"""
+
+    def __init__(self, subject, content):
+        self.subject = CompiledTemplate(subject)
+        self.content = CompiledTemplate(content)
+        self.fields = self.subject.fields | self.content.fields
+
+    def render(self, name='', email='', program_interest='', unsubscribe_url=''):
+        """Return (subject, html) for one recipient"""
+        values = {
+            'name': name or '',
+            'email': email or '',
+            'program_interest': program_interest or '',
+            'unsubscribe_url': unsubscribe_url or ''
+        }
+        # Subjects are plain text; only the HTML body needs escaping
+        subject = self.subject.render(values)
+        if not self.content.slots:
+            return subject, self.content.parts[0]
+        escaped = {field: html.escape(values[field]) for field in self.content.fields}
+        return subject, self.content.render(escaped)
+
+
+class TemplateCache(object):
+    """Small LRU of compiled newsletters keyed by (template id, updated_at, variant).
+
+    `variant` distinguishes per-campaign preparations of the same template,
+    such as tracking-rewritten links.
+    """
+
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template_id, updated_at, subject, content, variant=None):
+        key = (template_id, updated_at, variant)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                return compiled
+
+        compiled = CompiledNewsletter(subject, content)
+        with self._lock:
+            self._entries[key] = compiled
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
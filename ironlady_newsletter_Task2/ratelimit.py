@@ -0,0 +1,98 @@
+"""
+Iron Lady Newsletter System - Send Rate Limiting
+Token buckets for the SMTP provider's per-second, per-minute and daily
+quotas, with adaptive slow-down and jittered backoff when the provider
+starts returning 4xx throttling responses.
+"""
+
+import random
+import threading
+import time
+
+
+class TokenBucket(object):
+    """Classic token bucket; not thread-safe on its own (SendScheduler locks)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)  # tokens per second
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until one token is available (0 if available now)"""
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class SendScheduler(object):
+    """Blocks senders so every configured quota is respected.
+
+    A limit of 0 disables that window. The per-second rate adapts: each
+    throttling response halves it (down to 5% of the configured rate) and
+    pauses all senders for a jittered backoff; successes slowly restore it.
+    """
+
+    MIN_FACTOR = 0.05
+    RECOVERY_STEP = 0.01
+
+    def __init__(self, per_second=0, per_minute=0, per_day=0, backoff_base=1.0, backoff_max=60.0):
+        self.per_second = per_second
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.factor = 1.0
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+        self._second = TokenBucket(per_second, max(1, per_second)) if per_second else None
+        self._buckets = [bucket for bucket in (
+            self._second,
+            TokenBucket(per_minute / 60.0, per_minute) if per_minute else None,
+            TokenBucket(per_day / 86400.0, per_day) if per_day else None,
+        ) if bucket]
+
+    @property
+    def enabled(self):
+        return bool(self._buckets)
+
+    def acquire(self):
+        """Wait until a message may be sent, then consume one token from every bucket"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    for bucket in self._buckets:
+                        bucket.refill(now)
+                    wait = max([bucket.wait_time() for bucket in self._buckets] or [0.0])
+                    if wait <= 0:
+                        for bucket in self._buckets:
+                            bucket.tokens -= 1
+                        return
+            time.sleep(wait)
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff for retry number `attempt` (0-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def throttled(self, attempt=0):
+        """Record a throttling response; slows everyone down and returns the retry delay"""
+        delay = self.backoff(attempt)
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            if self._second:
+                self.factor = max(self.MIN_FACTOR, self.factor * 0.5)
+                self._second.rate = self.per_second * self.factor
+        return delay
+
+    def succeeded(self):
+        if self._second is None or self.factor >= 1.0:
+            return
+        with self._lock:
+            self.factor = min(1.0, self.factor + self.RECOVERY_STEP)
+            self._second.rate = self.per_second * self.factor
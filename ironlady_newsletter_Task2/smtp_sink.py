@@ -0,0 +1,133 @@
+"""
+Iron Lady Newsletter System - Local SMTP Sink
+A minimal SMTP server that accepts and discards mail, for testing sends
+without touching Gmail.
+
+Usage:
+    python smtp_sink.py --port 1025
+
+Then run the app with:
+    MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=false python app.py
+
+Add --throttle-every N to answer every Nth recipient with a 451
+"try again later", the way a provider does when a quota is hit.
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        sink = self.server.sink
+        self.reply('220 ironlady-sink ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb == 'EHLO':
+                self.wfile.write(b'250-ironlady-sink\r\n250-8BITMIME\r\n250-AUTH PLAIN\r\n250 SIZE 52428800\r\n')
+            elif verb in ('HELO', 'MAIL', 'RCPT', 'RSET', 'NOOP'):
+                if verb == 'RCPT' and not sink.record_recipient():
+                    self.reply('451 4.7.1 Rate limit exceeded, try again later')
+                    continue
+                self.reply('250 OK')
+            elif verb == 'AUTH':
+                # Accept any credentials so the app's MAIL_USERNAME/PASSWORD can stay set
+                self.reply('235 Authentication successful')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    size += len(data)
+                sink.record_message(size)
+                self.reply('250 OK queued')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class _ThreadingSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink(object):
+    """Threaded SMTP server that counts and drops every message it receives"""
+
+    def __init__(self, host='127.0.0.1', port=1025, throttle_every=0):
+        self._server = _ThreadingSMTPServer((host, port), _SMTPHandler)
+        self._server.sink = self
+        self._lock = threading.Lock()
+        self._thread = None
+        self.messages = 0
+        self.recipients = 0
+        self.bytes = 0
+        self.throttle_every = throttle_every
+        self.throttled = 0
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def record_recipient(self):
+        """Count a RCPT; returns False when it should be throttled"""
+        with self._lock:
+            self.recipients += 1
+            if self.throttle_every and self.recipients % self.throttle_every == 0:
+                self.throttled += 1
+                return False
+            return True
+
+    def record_message(self, size):
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local SMTP sink for newsletter testing')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    parser.add_argument('--throttle-every', type=int, default=0,
+                        help='reply 451 to every Nth recipient (0 = never)')
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.throttle_every).start()
+    print(f"📭 SMTP sink listening on {args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"   received {sink.messages} messages, {sink.bytes} bytes, throttled {sink.throttled}")
+    except KeyboardInterrupt:
+        sink.stop()
@@ -0,0 +1,107 @@
+"""
+Iron Lady Newsletter System - Storage Configuration
+Engine options for SQLite or a server database, SQLite pragmas applied to
+every new connection, and a small runner for numbered schema migrations.
+"""
+
+import sqlite3
+import time
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, event, select
+from sqlalchemy.engine import Engine, make_url
+
+DEFAULT_DATABASE_URI = 'sqlite:///newsletter.db'
+
+# Applied on connect. WAL lets dashboard reads run while a send job writes;
+# NORMAL sync is durable across app crashes (only an OS crash can lose the
+# last commits) and is the recommended pairing with WAL.
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', 30000),  # ms to wait on a locked database instead of failing
+    ('cache_size', -16000),  # 16 MB page cache per connection
+    ('temp_store', 'MEMORY'),
+)
+
+
+def engine_options(uri, pool_size=10, max_overflow=20):
+    """SQLALCHEMY_ENGINE_OPTIONS suited to the database behind `uri`"""
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            # In-memory databases live in a single connection; keep the default pool
+            return {}
+        return {
+            # Background send and scheduler threads share pooled connections
+            'connect_args': {'check_same_thread': False, 'timeout': 30},
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+        }
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': 30,
+        'pool_recycle': 1800,  # below typical server idle timeouts
+        'pool_pre_ping': True,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS:
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
+
+
+def enable_sqlite_pragmas():
+    """Apply SQLITE_PRAGMAS to every SQLite connection opened from now on"""
+    if not event.contains(Engine, 'connect', _set_sqlite_pragmas):
+        event.listen(Engine, 'connect', _set_sqlite_pragmas)
+
+
+# Schema Migrations
+_version_metadata = MetaData()
+schema_version = Table(
+    'schema_version', _version_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200)),
+    Column('applied_at', DateTime),
+)
+
+
+def applied_versions(engine):
+    _version_metadata.create_all(engine, checkfirst=True)
+    with engine.connect() as connection:
+        return {row.version for row in connection.execute(select(schema_version.c.version))}
+
+
+def run_migrations(engine, migrations):
+    """Apply every pending (version, description, function) in version order.
+
+    Each migration runs in its own transaction together with the row that
+    records it, so a failure leaves the database at the previous version.
+    Migrations receive the connection. Besides the schema left by the
+    migrations before them, they may meet a database created before
+    migrations existed, so they should check before creating things.
+    Returns the versions applied.
+    """
+    done = applied_versions(engine)
+    applied = []
+    for version, description, migrate in sorted(migrations, key=lambda item: item[0]):
+        if version in done:
+            continue
+        started = time.monotonic()
+        with engine.begin() as connection:
+            migrate(connection)
+            connection.execute(schema_version.insert().values(
+                version=version,
+                description=description,
+                applied_at=datetime.utcnow()
+            ))
+        print(f"🗄️  Migration {version} applied: {description} ({time.monotonic() - started:.2f}s)")
+        applied.append(version)
+    return applied
+